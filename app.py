@@ -1,141 +1,1394 @@
-from flask import Flask, request, jsonify, render_template
+from flask import Flask, request, jsonify, render_template, g, has_request_context
 import sqlite3
+import heapq
+import cProfile
+import bisect
+import itertools
+import re
+import math
+import mmap
+import multiprocessing
+import queue
+import struct
 import getpass
-from functools import lru_cache
+import threading
+import time
+from collections import OrderedDict, namedtuple
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from contextlib import contextmanager
+from functools import wraps
+from itertools import islice
 import os
+from pathlib import Path
 
 app = Flask(__name__)
 
 BASE_USER = getpass.getuser()
 
+MAX_TOP_K = 100  # upper bound on ranked results returned by /schedule
+MAX_CLASS_DETAILS = 50  # class names accepted by one /class_details call
+MAX_SEARCH_RESULTS = 500  # sections returned by one /search_sections call
+
+# Per-request search limits for /schedule (None disables a limit)
+app.config.setdefault('SCHEDULE_NODE_BUDGET', 2_000_000)
+app.config.setdefault('SCHEDULE_TIMEOUT', 5.0)  # seconds
+
+# Process-pool search for full-list requests whose estimated size is above the threshold.
+# Opt-in: every web worker process would start its own pool (plus a Manager process),
+# so size it as the cores left per web worker, e.g. cpu_count // web workers
+app.config.setdefault('PARALLEL_WORKERS', 1)  # 1 = search in the request thread
+app.config.setdefault('PARALLEL_THRESHOLD', 2_000_000)  # product of the section counts per sigle
+
+# Schedule result cache
+app.config.setdefault('SCHEDULE_CACHE_SIZE', 256)  # entries
+app.config.setdefault('SCHEDULE_CACHE_TTL', 3600)  # seconds
+app.config.setdefault('SCHEDULE_CACHE_MAX_SCHEDULES', 20_000)  # larger results are not cached
+
+app.config.setdefault('CATALOG_MAX_SEASONS', 6)  # most recent seasons kept in memory
+
+app.config.setdefault('DATABASE', os.path.join(os.path.dirname(__file__), 'static', 'data', 'database.db'))
+app.config.setdefault('CATALOG_SNAPSHOT', os.path.join(os.path.dirname(__file__), 'static', 'data', 'catalog.bin'))
+
+# Latency histograms and solver counters, exported on /metrics
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+METRIC_HELP = {
+    'uqam_request_seconds': ('histogram', 'Request latency by endpoint.'),
+    'uqam_stage_seconds': ('histogram', 'Time spent in each stage of a request.'),
+    'uqam_solver_nodes_total': ('counter', 'Search nodes visited by the schedule solver.'),
+    'uqam_solver_overlap_checks_total': ('counter', 'Section-versus-sigle conflict checks done by the solver.'),
+    'uqam_solver_pruned_total': ('counter', 'Branches pruned by the solver.'),
+    'uqam_solver_emitted_total': ('counter', 'Schedules produced by the solver.'),
+    'uqam_solver_truncated_total': ('counter', 'Searches stopped early by their budget.'),
+    'uqam_schedule_cache_hits_total': ('counter', 'Schedule cache hits.'),
+    'uqam_schedule_cache_misses_total': ('counter', 'Schedule cache misses.'),
+}
+
+class Metrics:
+    """Process-local latency histograms and counters, rendered in the Prometheus text format."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._histograms = {}  # (name, labels) -> [count per bucket..., +Inf count, sum]
+        self._counters = {}  # (name, labels) -> value
+
+    def observe(self, name, seconds, **labels):
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            values = self._histograms.setdefault(key, [0] * (len(LATENCY_BUCKETS) + 2))
+            for i, bound in enumerate(LATENCY_BUCKETS):
+                if seconds <= bound:
+                    values[i] += 1
+            values[-2] += 1
+            values[-1] += seconds
+
+    def inc(self, name, value=1, **labels):
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + value
+
+    def render(self, extra_counters=()):
+        def fmt(labels):
+            return '{' + ','.join(f'{k}="{v}"' for k, v in labels) + '}' if labels else ''
+
+        lines = []
+        with self._lock:
+            series = {}
+            for (name, labels), values in self._histograms.items():
+                for i, bound in enumerate(LATENCY_BUCKETS):
+                    series.setdefault(name, []).append(f'{name}_bucket{fmt(labels + (("le", bound),))} {values[i]}')
+                series[name].append(f'{name}_bucket{fmt(labels + (("le", "+Inf"),))} {values[-2]}')
+                series[name].append(f'{name}_sum{fmt(labels)} {values[-1]}')
+                series[name].append(f'{name}_count{fmt(labels)} {values[-2]}')
+            for (name, labels), value in list(self._counters.items()) + list(extra_counters):
+                series.setdefault(name, []).append(f'{name}{fmt(labels)} {value}')
+        for name in sorted(series):
+            kind, text = METRIC_HELP.get(name, ('untyped', name))
+            lines += [f'# HELP {name} {text}', f'# TYPE {name} {kind}'] + series[name]
+        return '\n'.join(lines) + '\n'
+
+metrics = Metrics()
+
+@contextmanager
+def timed(stage):
+    """Time a stage: feeds the stage histogram and this request's Server-Timing header."""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - start
+        metrics.observe('uqam_stage_seconds', elapsed, stage=stage)
+        if has_request_context():
+            timings = g.setdefault('timings', {})
+            timings[stage] = timings.get(stage, 0.0) + elapsed
+
+@app.before_request
+def _start_request_timer():
+    g.request_start = time.perf_counter()
+
+@app.after_request
+def _record_request_timing(response):
+    start = g.pop('request_start', None)
+    if start is not None:
+        elapsed = time.perf_counter() - start
+        metrics.observe('uqam_request_seconds', elapsed, endpoint=request.endpoint or 'unknown')
+        timings = g.get('timings', {})
+        entries = [f'{stage};dur={seconds * 1000:.2f}' for stage, seconds in timings.items()]
+        entries.append(f'total;dur={elapsed * 1000:.2f}')
+        response.headers['Server-Timing'] = ', '.join(entries)
+    return response
+
+# Opt-in profiling of single /schedule requests: send "X-Profile: 1" (or profile=1)
+# while PROFILING_ENABLED is on, or profile every Nth request with PROFILE_SAMPLE_EVERY
+app.config.setdefault('PROFILING_ENABLED', False)
+app.config.setdefault('PROFILE_DIR', os.path.join(os.path.dirname(__file__), 'profiles'))
+app.config.setdefault('PROFILE_SAMPLE_EVERY', 0)  # 0 disables sampling
+
+_profile_counter = itertools.count(1)
+_profile_files = itertools.count(1)
+
+def _should_profile():
+    if not app.config['PROFILING_ENABLED']:
+        return False
+    if request.headers.get('X-Profile') == '1' or request.values.get('profile') == '1':
+        return True
+    every = app.config['PROFILE_SAMPLE_EVERY']
+    return bool(every) and next(_profile_counter) % every == 0
+
+def _profile_path():
+    season = request.values.get('season', '')
+    sigles = sorted({s.strip().upper() for s in request.values.get('sigles', '').split(',') if s.strip()})
+    tag = re.sub(r'[^A-Za-z0-9_-]+', '_', f"{season}-{'_'.join(sigles)}")[:150]
+    stamp = time.strftime('%Y%m%d-%H%M%S')
+    return os.path.join(app.config['PROFILE_DIR'], f'{stamp}-{os.getpid()}-{next(_profile_files)}-{tag}.prof')
+
+def profiled(view):
+    """Run *view* under cProfile when the request opts in, and dump the profile to PROFILE_DIR."""
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        if not _should_profile():
+            return view(*args, **kwargs)
+        profiler = cProfile.Profile()
+        try:
+            return profiler.runcall(view, *args, **kwargs)
+        finally:
+            os.makedirs(app.config['PROFILE_DIR'], exist_ok=True)
+            path = _profile_path()
+            profiler.dump_stats(path)
+            app.logger.info("Wrote profile %s", path)
+    return wrapper
+
+# Serving connections are read-only and tuned for lookups
+app.config.setdefault('SQLITE_MMAP_SIZE', 256 * 1024 * 1024)  # bytes
+app.config.setdefault('SQLITE_CACHE_SIZE', -16 * 1024)  # negative = KiB
+app.config.setdefault('SQLITE_CACHED_STATEMENTS', 64)
+app.config.setdefault('SQLITE_POOL_SIZE', 8)  # idle connections kept for reuse
+
+class PooledConnection(sqlite3.Connection):
+    version = None  # db_version() of the file it was opened on
+
+# Shared by every request thread (the dev server starts a new thread per request);
+# each connection is used by one thread at a time, between get and close
+_pool = queue.LifoQueue(maxsize=app.config['SQLITE_POOL_SIZE'])
+
 # Database helper functions
 def get_db_connection():
-    db_path = os.path.join(os.path.dirname(__file__), 'static', 'data', 'database.db')
-    conn = sqlite3.connect(db_path)
+    """Return an idle pooled read-only connection, or open a new one.
+
+    Connections opened on an older database file are closed instead of
+    reused, so a rebuilt database is picked up without restarting the app.
+    """
+    version = db_version()
+    while True:
+        try:
+            conn = _pool.get_nowait()
+        except queue.Empty:
+            break
+        if conn.version == version:
+            return conn
+        conn.close()
+
+    uri = Path(app.config['DATABASE']).resolve().as_uri() + '?mode=ro'
+    conn = sqlite3.connect(uri, uri=True, factory=PooledConnection, check_same_thread=False,
+                           cached_statements=app.config['SQLITE_CACHED_STATEMENTS'])
+    conn.version = version
     conn.row_factory = sqlite3.Row
+    conn.execute('PRAGMA query_only = ON')
+    conn.execute(f"PRAGMA mmap_size = {int(app.config['SQLITE_MMAP_SIZE'])}")
+    conn.execute(f"PRAGMA cache_size = {int(app.config['SQLITE_CACHE_SIZE'])}")
     return conn
 
+def db_version():
+    """Return a stamp that changes whenever the database file is rebuilt (None if missing)."""
+    try:
+        stat = os.stat(app.config['DATABASE'])
+    except FileNotFoundError:
+        return None
+    return (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+
 def close_db_connection(conn):
-    if conn:
-        conn.close()
+    # Back to the pool for the next request, unless the file changed or enough are idle
+    if not conn:
+        return
+    if getattr(conn, 'version', None) == db_version():
+        try:
+            _pool.put_nowait(conn)
+            return
+        except queue.Full:
+            pass
+    conn.close()
+
+# Week occupancy bitmasks: one bit per minute, days laid out back to back
+DAYS = ['Lundi', 'Mardi', 'Mercredi', 'Jeudi', 'Vendredi', 'Samedi', 'Dimanche']
+DAY_INDEX = {day: i for i, day in enumerate(DAYS)}
+MINUTES_PER_DAY = 24 * 60
+
+def _week_mask(day_times):
+    mask = 0
+    for day, start, end in day_times:
+        # Meetings without a weekday or a valid time range never conflict
+        if day not in DAY_INDEX or start < 0 or end <= start:
+            continue
+        offset = DAY_INDEX[day] * MINUTES_PER_DAY + start
+        mask |= ((1 << (end - start)) - 1) << offset
+    return mask
 
 class Task:
     def __init__(self, name, day_times):
         self.name = name
+        self.sigle = name.split('-')[0]
         self.day_times = day_times  # day_times is a list of (day, start_time, end_time) tuples
+        self.mask = _week_mask(day_times)  # compiled once, conflict checks are a single AND
 
     def overlaps_with(self, other_task):
-        for day1, start1, end1 in self.day_times:
-            for day2, start2, end2 in other_task.day_times:
-                if day1 == day2 and not (end1 <= start2 or start1 >= end2):
-                    return True
-        return False
+        return bool(self.mask & other_task.mask)
 
     def __repr__(self):
         return f"Task({self.name}, {self.day_times})"
 
-def _convert_to_minutes(time_str):
-    if not time_str:
-        return -1
-    try:
-        hours, minutes = map(int, time_str.split('h'))
-        return hours * 60 + minutes
-    except ValueError:
-        print(f"Warning: Invalid time format '{time_str}'. Expected format like '10h30'.")
-        return -1
+def build_conflict_graph(tasks):
+    """Number the tasks and give each one a bitset of the tasks it conflicts with.
+
+    Meetings are swept day by day in start order, so only pairs that really
+    overlap are visited instead of every pair of the season.
+    """
+    meetings_by_day = {}
+    for index, task in enumerate(tasks):
+        task.index = index
+        for day, start, end in task.day_times:
+            if day in DAY_INDEX and 0 <= start < end:
+                meetings_by_day.setdefault(day, []).append((start, end, index))
+
+    neighbours = [set() for _ in tasks]
+    for meetings in meetings_by_day.values():
+        meetings.sort()
+        active = []
+        for start, end, index in meetings:
+            active = [meeting for meeting in active if meeting[0] > start]
+            for _, other in active:
+                if other != index:
+                    neighbours[index].add(other)
+                    neighbours[other].add(index)
+            active.append((end, index))
+
+    # One int per task: OR-ing bits into a season-wide int would copy it for every pair
+    n_bytes = (len(tasks) + 7) // 8
+    for task, others in zip(tasks, neighbours):
+        bits = bytearray(n_bytes)
+        for other in others:
+            bits[other >> 3] |= 1 << (other & 7)
+        task.conflicts = int.from_bytes(bits, 'little')
+    return tasks
 
-@lru_cache(maxsize=None)
 def read_tasks_from_db(season):
+    with timed('db_load'):
+        return _read_tasks_from_db(season)
+
+def _read_tasks_from_db(season):
     tasks = {}
     conn = get_db_connection()
     cursor = conn.cursor()
-    
-    # Use a LIKE clause to filter tasks by season (case-insensitive)
+
+    # Season and times are precomputed columns: this is an index seek on (Season, Sigle)
     query = """
-        SELECT Name, Day, Start_Time, End_Time
+        SELECT Name, Day, Start_Minute, End_Minute
         FROM tasks_table
-        WHERE LOWER(Name) LIKE ?
+        WHERE Season = ?
+        ORDER BY Sigle, Name
     """
-    # Format the season with wildcards
-    cursor.execute(query, (f"%{season.lower()}%",))
-    
+    cursor.execute(query, (season.lower(),))
+
     rows = cursor.fetchall()
     for row in rows:
         key = row['Name']
-        day_time = (row['Day'], _convert_to_minutes(row['Start_Time']), _convert_to_minutes(row['End_Time']))
+        start, end = row['Start_Minute'], row['End_Minute']
+        day_time = (row['Day'], -1 if start is None else start, -1 if end is None else end)
         if key in tasks:
             tasks[key].append(day_time)
         else:
             tasks[key] = [day_time]
 
     close_db_connection(conn)
-    return [Task(name, day_times) for name, day_times in tasks.items()]
+    # The conflict graph is the same for every request on this season: build it once here
+    return build_conflict_graph([Task(name, day_times) for name, day_times in tasks.items()])
+
+def list_seasons_from_db():
+    conn = get_db_connection()
+    rows = conn.execute("SELECT DISTINCT Season FROM tasks_table WHERE Season IS NOT NULL").fetchall()
+    close_db_connection(conn)
+    return sorted(row['Season'] for row in rows)
+
+# Terms in calendar order, to keep the most recent seasons when the catalog is capped
+SEASON_TERMS = {'hiver': 0, 'ete': 1, 'automne': 2}
+
+def _season_sort_key(season):
+    term = season.rstrip('0123456789')
+    year = season[len(term):]
+    return (int(year) if year else 0, SEASON_TERMS.get(term, -1), season)
+
+class SeasonIndex:
+    """The sections of one season, with hash lookups by sigle."""
+
+    version = None  # the catalog state it belongs to, set by Catalog.load
+
+    def __init__(self, tasks):
+        self.tasks = tasks
+        self.by_sigle = {}
+        for task in tasks:
+            self.by_sigle.setdefault(task.sigle, []).append(task)
+
+    def sigles(self):
+        return self.by_sigle.keys()
+
+    def sections(self, sigle):
+        return self.by_sigle.get(sigle, [])
+
+def database_stamp():
+    # Random stamp written by scripts/convert_csv_to_sql.py, recorded in the snapshot built from it
+    conn = get_db_connection()
+    try:
+        row = conn.execute("SELECT stamp FROM build_info").fetchone()
+    except sqlite3.OperationalError:  # database from before build stamps
+        row = None
+    close_db_connection(conn)
+    return bytes.fromhex(row['stamp']) if row else None
+
+class CatalogSnapshot:
+    """Read-only, memory-mapped view of the file written by scripts/build_catalog_snapshot.py.
+
+    The arrays, conflict bitsets included, are used in place, so every worker
+    process maps the same pages and only builds Tasks for the sigles it is asked for.
+    """
+    MAGIC = b'UQCAT003'
+    HEADER = struct.Struct('<8s5I16s')
+
+    def __init__(self, path):
+        with open(path, 'rb') as f:
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        (magic, n_strings, n_string_bytes, n_sections, n_meetings,
+         self.conflict_bytes, _) = self.HEADER.unpack_from(self._mm)
+        if magic != self.MAGIC:
+            raise ValueError(f"{path} is not a catalog snapshot")
+
+        view = memoryview(self._mm)
+        offset = self.HEADER.size
+
+        def take(fmt, count):
+            nonlocal offset
+            values = view[offset:offset + 4 * count].cast(fmt)
+            offset += 4 * count
+            return values
+
+        self._str_offsets = take('I', n_strings + 1)
+        self._str_bytes = view[offset:offset + n_string_bytes]
+        offset += n_string_bytes + (-n_string_bytes % 4)
+        self.sec_name = take('I', n_sections)
+        self.sec_sigle = take('I', n_sections)
+        self.sec_season = take('I', n_sections)
+        self.sec_meetings = take('I', n_sections + 1)
+        self.meet_day = take('I', n_meetings)
+        self.meet_start = take('i', n_meetings)
+        self.meet_end = take('i', n_meetings)
+        self.sec_conflicts = view[offset:offset + n_sections * self.conflict_bytes]
+
+    @classmethod
+    def stamp(cls, path):
+        """The database build stamp in the header of *path*, or None if it is not a current snapshot."""
+        with open(path, 'rb') as f:
+            header = f.read(cls.HEADER.size)
+        if len(header) < cls.HEADER.size or header[:8] != cls.MAGIC:
+            return None
+        return cls.HEADER.unpack(header)[-1]
+
+    def string(self, string_id):
+        return str(self._str_bytes[self._str_offsets[string_id]:self._str_offsets[string_id + 1]], 'utf-8')
+
+    def season_ranges(self):
+        """Return {season: (first, last + 1)} section id ranges."""
+        ranges = {}
+        for section_id, season_id in enumerate(self.sec_season):
+            first, _ = ranges.get(season_id, (section_id, section_id))
+            ranges[season_id] = (first, section_id + 1)
+        return {self.string(season_id): bounds for season_id, bounds in ranges.items()}
+
+    def task(self, section_id, season_first):
+        """The Task of a section, numbered within its season (which starts at *season_first*)."""
+        meetings = range(self.sec_meetings[section_id], self.sec_meetings[section_id + 1])
+        day_times = [(self.string(self.meet_day[m]), self.meet_start[m], self.meet_end[m]) for m in meetings]
+        task = Task(self.string(self.sec_name[section_id]), day_times)
+        task.index = section_id - season_first
+        offset = section_id * self.conflict_bytes
+        task.conflicts = int.from_bytes(self.sec_conflicts[offset:offset + self.conflict_bytes], 'little')
+        return task
+
+class SnapshotSeasonIndex:
+    """A ``SeasonIndex`` over a catalog snapshot: sections become Tasks only when requested."""
+
+    version = None  # the catalog state it belongs to, set by Catalog.load
+
+    def __init__(self, snapshot, first, last):
+        self._snapshot = snapshot
+        self._first = first
+        # Sections are sorted by sigle: only decode a sigle where a new range starts
+        self._ranges = {}
+        sigle_ids = snapshot.sec_sigle
+        start = first
+        for section_id in range(first + 1, last + 1):
+            if section_id == last or sigle_ids[section_id] != sigle_ids[start]:
+                self._ranges[snapshot.string(sigle_ids[start])] = (start, section_id)
+                start = section_id
+        self._tasks = {}
+
+    def sigles(self):
+        return self._ranges.keys()
+
+    def sections(self, sigle):
+        tasks = self._tasks.get(sigle)
+        if tasks is None and sigle in self._ranges:
+            tasks = self._tasks.setdefault(
+                sigle, [self._snapshot.task(i, self._first) for i in range(*self._ranges[sigle])])
+        return tasks or []
+
+def snapshot_version():
+    try:
+        stat = os.stat(app.config['CATALOG_SNAPSHOT'])
+    except FileNotFoundError:
+        return None
+    return (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+
+class Catalog:
+    """Season -> sigle -> sections, loaded once and hot-swapped when the database changes.
+
+    Only the *max_seasons* most recent seasons found in the database are kept;
+    any other season string simply has no sections. A reload builds a complete
+    new state before swapping it in with a single assignment, so requests
+    never see a half-loaded catalog. When the memory-mapped snapshot was
+    built from the current database (same build stamp) it is used in place
+    of SQLite: it already holds the conflict graph, and sections become
+    Tasks only when requested. Otherwise every season is read from SQLite
+    and gets its conflict graph at load time.
+    """
+
+    def __init__(self, max_seasons):
+        self.max_seasons = max_seasons
+        self._state = (None, {})  # (version, {season: SeasonIndex})
+        self._reload_lock = threading.Lock()
+
+    @staticmethod
+    def _version():
+        return (db_version(), snapshot_version())
+
+    def load(self):
+        version = self._version()
+        if self._snapshot_is_current(version):
+            seasons = self._load_snapshot()
+        else:
+            seasons = self._load_database()
+        for index in seasons.values():
+            index.version = version
+        self._state = (version, seasons)
+
+    @staticmethod
+    def _snapshot_is_current(version):
+        # Compared by build stamp, not mtime: copies and checkouts do not preserve mtimes
+        database, snapshot = version
+        if snapshot is None:
+            return False
+        if database is None:
+            return True
+        stamp = CatalogSnapshot.stamp(app.config['CATALOG_SNAPSHOT'])
+        return stamp is not None and stamp == database_stamp()
+
+    def _load_snapshot(self):
+        snapshot = CatalogSnapshot(app.config['CATALOG_SNAPSHOT'])
+        ranges = snapshot.season_ranges()
+        seasons = sorted(ranges, key=_season_sort_key)[-self.max_seasons:]
+        return {season: SnapshotSeasonIndex(snapshot, *ranges[season]) for season in seasons}
+
+    def _load_database(self):
+        seasons = sorted(list_seasons_from_db(), key=_season_sort_key)[-self.max_seasons:]
+        return {season: SeasonIndex(read_tasks_from_db(season)) for season in seasons}
+
+    def _current(self):
+        version, seasons = self._state
+        # One thread reloads while the others keep serving the previous state
+        if version != self._version() and self._reload_lock.acquire(blocking=False):
+            try:
+                if self._state[0] != self._version():
+                    self.load()
+            finally:
+                self._reload_lock.release()
+        return self._state[1]
+
+    def season(self, season):
+        """Return the ``SeasonIndex`` for *season*, or None if it is not offered."""
+        return self._current().get(season.strip().lower())
+
+    def seasons(self):
+        return sorted(self._current(), key=_season_sort_key)
+
+class SearchBudget:
+    """Bounds one search with a node budget and a wall-clock deadline.
+
+    The solver calls ``spend()`` once per node and stops as soon as it returns
+    False; ``truncated`` then tells whether the results are partial.
+    A request is not stopped when its client goes away (the server cannot
+    tell before it writes the response): the deadline is what bounds it.
+    *stop*, anything with ``is_set()``, lets the parallel search stop its
+    worker processes.
+    """
+    CHECK_EVERY = 1024  # nodes between clock / stop checks
+
+    def __init__(self, max_nodes=None, timeout=None, stop=None):
+        self.max_nodes = max_nodes
+        self.deadline = time.monotonic() + timeout if timeout is not None else None
+        self.nodes = 0
+        self.truncated = False
+        # Solver counters, reported on /metrics
+        self.overlap_checks = 0
+        self.pruned = 0
+        self.emitted = 0
+        self._stop = stop
+
+    def counters(self):
+        return {'nodes': self.nodes, 'overlap_checks': self.overlap_checks,
+                'pruned': self.pruned, 'emitted': self.emitted}
+
+    def add(self, counters):
+        self.nodes += counters['nodes']
+        self.overlap_checks += counters['overlap_checks']
+        self.pruned += counters['pruned']
+        self.emitted += counters['emitted']
+
+    def expired(self):
+        return ((self._stop is not None and self._stop.is_set())
+                or (self.deadline is not None and time.monotonic() > self.deadline))
+
+    def spend(self):
+        if self.truncated:
+            return False
+        self.nodes += 1
+        if self.max_nodes is not None and self.nodes > self.max_nodes:
+            self.truncated = True
+        elif self.nodes % self.CHECK_EVERY == 0 and self.expired():
+            self.truncated = True
+        return not self.truncated
+
+def _day_bits(task):
+    # Bit d set <-> the task meets on DAYS[d]
+    bits = 0
+    for day, start, end in task.day_times:
+        if day in DAY_INDEX and 0 <= start < end:
+            bits |= 1 << DAY_INDEX[day]
+    return bits
+
+class ScheduleConstraints:
+    """What the user rules out: blocked time windows, forbidden days and a maximum of campus days.
+
+    Windows and days are hard limits on single sections, compiled into one
+    week mask like ``Task.mask``: offending sections are dropped before the
+    search. ``max_days`` depends on the whole schedule and is enforced while
+    backtracking.
+    """
+
+    def __init__(self, blocked=(), forbidden_days=(), max_days=None):
+        # blocked: (day, start, end) windows in minutes; day None blocks the window on every day
+        windows = [(day, 0, MINUTES_PER_DAY) for day in forbidden_days]
+        for day, start, end in blocked:
+            windows += [(d, start, end) for d in ([day] if day is not None else DAYS)]
+        self.mask = _week_mask(windows)
+        self.max_days = max_days if max_days is not None and max_days < len(DAYS) else None
+
+    def key(self):
+        # Equivalent constraints compile to the same mask, so they share cache entries
+        return (self.mask, self.max_days)
+
+    def allows(self, task):
+        if task.mask & self.mask:
+            return False
+        return self.max_days is None or _day_bits(task).bit_count() <= self.max_days
+
+    def restrict(self, tasks):
+        """The allowed tasks, or None if some sigle of *tasks* has no allowed section left."""
+        allowed = [task for task in tasks if self.allows(task)]
+        if {task.sigle for task in allowed} != {task.sigle for task in tasks}:
+            return None
+        return allowed
+
+def _prepare_search(tasks):
+    # Sort tasks by start time of the first timeslot (then name, so the order is reproducible)
+    tasks = sorted(tasks, key=lambda x: (x.day_times[0][1], x.name))
+    if all(hasattr(task, 'conflicts') for task in tasks):
+        # Slice the season-wide conflict graph down to the requested tasks (local bit i <-> tasks[i]):
+        # one AND per task keeps only requested neighbours, then just their set bits are walked
+        local = {task.index: j for j, task in enumerate(tasks)}
+        requested = 0
+        for task in tasks:
+            requested |= 1 << task.index
+        conflicts = []
+        for task in tasks:
+            neighbours, bits = task.conflicts & requested, 0
+            while neighbours:
+                lowest = neighbours & -neighbours
+                bits |= 1 << local[lowest.bit_length() - 1]
+                neighbours ^= lowest
+            conflicts.append(bits)
+    else:
+        # No season graph (tasks built by the caller): compare the week masks
+        conflicts = [sum(1 << j for j, other in enumerate(tasks) if j != i and task.mask & other.mask)
+                     for i, task in enumerate(tasks)]
+    return tasks, conflicts
+
+def find_possible_schedules(tasks, exact=False, rank_by=None, top_k=10, budget=None, workers=1,
+                            constraints=None):
+    """Return the conflict-free schedules that can be built from *tasks*.
+
+    By default every non-conflicting subset with at most one section per sigle
+    is returned, partial ones included. With ``exact=True`` the request is
+    treated as "pick exactly one section of every sigle present in *tasks*".
+    Passing objective names in *rank_by* (see ``OBJECTIVES``) implies exact mode
+    and returns only the *top_k* best schedules, best first.
+    An optional ``SearchBudget`` stops the search early; what was found so far is returned.
+    With ``workers > 1``, large exact searches (see ``PARALLEL_THRESHOLD``) are
+    split across a process pool.
+    ``ScheduleConstraints`` remove the sections they rule out before the search
+    and cap the campus days while backtracking.
+    """
+    max_days = None
+    if constraints is not None:
+        if rank_by or exact:
+            tasks = constraints.restrict(tasks)
+            if tasks is None:
+                return []
+        else:
+            tasks = [task for task in tasks if constraints.allows(task)]
+        max_days = constraints.max_days
+    if rank_by:
+        return rank_schedules(tasks, rank_by, top_k, budget, max_days)
+    if exact:
+        if workers > 1 and _estimate_leaves(tasks) >= app.config['PARALLEL_THRESHOLD']:
+            return _parallel_exact_schedules(tasks, workers, budget, max_days)
+        return list(_exact_schedules(tasks, budget, max_days))
+    tasks, conflicts = _prepare_search(tasks)
+    day_bits = [_day_bits(task) for task in tasks] if max_days is not None else None
 
-def find_possible_schedules(tasks):
-    tasks = sorted(tasks, key=lambda x: x.day_times[0][1])  # Sort tasks by start time of the first timeslot
     results = set()  # Use a set to store unique schedules
     schedule = []
     included_sigles = set()  # Set to track included sigles in the current schedule
 
-    def backtrack(index):
-        if all(not schedule[i].overlaps_with(schedule[j]) for i in range(len(schedule)) for j in range(i + 1, len(schedule))):
-            results.add(tuple(sorted(task.name for task in schedule)))
+    def backtrack(index, blocked, days):
+        if budget is not None and not budget.spend():
+            return
+        # Every task was checked against `blocked` before being added, so the schedule is conflict-free
+        results.add(tuple(sorted(task.name for task in schedule)))
 
         for i in range(index, len(tasks)):
-            sigle = tasks[i].name.split('-')[0]  # Extract the sigle part of the task name
-            if all(not task.overlaps_with(tasks[i]) for task in schedule) and sigle not in included_sigles:
+            sigle = tasks[i].sigle
+            if not (blocked >> i & 1) and sigle not in included_sigles:
+                days_after = days
+                if max_days is not None:
+                    days_after |= day_bits[i]
+                    if days_after.bit_count() > max_days:
+                        continue
                 schedule.append(tasks[i])
                 included_sigles.add(sigle)
-                backtrack(i + 1)
+                backtrack(i + 1, blocked | conflicts[i], days_after)
                 schedule.pop()
                 included_sigles.remove(sigle)
 
-    backtrack(0)
+    backtrack(0, 0, 0)
     return [list(sch) for sch in results]  # Convert set of tuples to list of lists
 
+def iter_schedules(tasks, budget=None, constraints=None):
+    """Lazily yield the schedules taking exactly one section of every sigle in *tasks*.
+
+    The order is deterministic for a given list of tasks, so callers can page
+    through the results by skipping the ones they already sent.
+    """
+    max_days = None
+    if constraints is not None:
+        tasks = constraints.restrict(tasks)
+        if tasks is None:
+            return
+        max_days = constraints.max_days
+    yield from _exact_schedules(tasks, budget, max_days)
+
+def _exact_schedules(tasks, budget=None, max_days=None):
+    tasks, conflicts = _prepare_search(tasks)
+    for schedule in _search_exact(tasks, conflicts, budget=budget, max_days=max_days):
+        yield sorted(task.name for task in schedule)
+
+def _initial_candidates(tasks):
+    # candidates[sigle] is the bitset of local task indices still compatible with the partial schedule
+    candidates = {}
+    for i, task in enumerate(tasks):
+        candidates[task.sigle] = candidates.get(task.sigle, 0) | 1 << i
+    return candidates
+
+def _most_constrained(remaining):
+    return min(remaining, key=lambda s: remaining[s].bit_count())
+
+def _narrow(remaining, sigle, conflicts_of_choice):
+    # Candidates of the other sigles once a section of `sigle` is chosen, or None if one runs out
+    narrowed = {}
+    for other, compatible in remaining.items():
+        if other == sigle:
+            continue
+        compatible &= ~conflicts_of_choice
+        if not compatible:
+            return None
+        narrowed[other] = compatible
+    return narrowed
+
+def _search_exact(tasks, conflicts, prune=None, budget=None, root=None, max_days=None):
+    # Yields tuples of tasks; `prune(schedule)` may cut a partial schedule and its whole subtree.
+    # With `root`, only the subtree where the first branching picks tasks[root] is searched.
+    # With `max_days`, schedules meeting on more distinct days are never built.
+    candidates = _initial_candidates(tasks)
+    schedule = []
+    if max_days is not None:
+        day_bits = [_day_bits(task) for task in tasks]
+        # on_day[d]: bitset of the local tasks meeting on DAYS[d]
+        on_day = [sum(1 << i for i, bits in enumerate(day_bits) if bits >> d & 1) for d in range(len(DAYS))]
+
+    def choose(remaining, sigle, i, days):
+        # (candidates left once tasks[i] is picked, days used), or None if the subtree is empty
+        excluded = conflicts[i]
+        if max_days is not None:
+            days |= day_bits[i]
+            used = days.bit_count()
+            if used > max_days:
+                return None
+            if used == max_days:
+                # No day left to spend: sections meeting on any other day are out too
+                for d in range(len(DAYS)):
+                    if not days >> d & 1:
+                        excluded |= on_day[d]
+        narrowed = _narrow(remaining, sigle, excluded)
+        return None if narrowed is None else (narrowed, days)
+
+    def backtrack(remaining, days):
+        if budget is not None and not budget.spend():
+            return
+        if not remaining:
+            if budget is not None:
+                budget.emitted += 1
+            yield tuple(schedule)
+            return
+
+        # Branch on the sigle with the fewest compatible sections left
+        sigle = _most_constrained(remaining)
+        options = remaining[sigle]
+        while options and not (budget is not None and budget.truncated):
+            i = (options & -options).bit_length() - 1
+            options &= options - 1
+            chosen = choose(remaining, sigle, i, days)
+            if budget is not None:
+                budget.overlap_checks += len(remaining) - 1
+            if chosen is not None:  # otherwise some sigle has no section left: prune the whole subtree
+                schedule.append(tasks[i])
+                if prune is None or not prune(schedule):
+                    yield from backtrack(*chosen)
+                elif budget is not None:
+                    budget.pruned += 1
+                schedule.pop()
+            elif budget is not None:
+                budget.pruned += 1
+
+    if root is None:
+        yield from backtrack(candidates, 0)
+        return
+    chosen = choose(candidates, tasks[root].sigle, root, 0)
+    if chosen is not None:
+        schedule.append(tasks[root])
+        yield from backtrack(*chosen)
+
+def _estimate_leaves(tasks):
+    # Upper bound on the number of exact schedules: product of the section counts
+    counts = {}
+    for task in tasks:
+        counts[task.sigle] = counts.get(task.sigle, 0) + 1
+    return math.prod(counts.values())
+
+_executor = None
+_manager = None
+_executor_lock = threading.Lock()
+PARALLEL_POLL_INTERVAL = 0.05  # seconds between deadline checks while workers run
+
+def _get_executor(workers):
+    # Spawned, not forked: forking from a request thread can copy a lock held by another thread
+    global _executor, _manager
+    with _executor_lock:
+        if _executor is None:
+            context = multiprocessing.get_context('spawn')
+            _manager = context.Manager()
+            _executor = ProcessPoolExecutor(max_workers=workers, mp_context=context)
+        return _executor, _manager
+
+def _search_subtree(task_data, root, max_nodes, deadline, stop, max_days=None):
+    # Runs in a worker process: rebuild the (already sorted) tasks and search one subtree.
+    # `deadline` is absolute (time.time()): a subtree that waited in the queue only gets what is left.
+    timeout = deadline - time.time() if deadline is not None else None
+    budget = SearchBudget(max_nodes, timeout, stop)
+    if budget.expired():
+        return [], budget.counters(), True
+    tasks = [Task(name, day_times) for name, day_times in task_data]
+    conflicts = [sum(1 << j for j, other in enumerate(tasks) if j != i and task.mask & other.mask)
+                 for i, task in enumerate(tasks)]
+    schedules = [sorted(task.name for task in schedule)
+                 for schedule in _search_exact(tasks, conflicts, budget=budget, root=root, max_days=max_days)]
+    return schedules, budget.counters(), budget.truncated
+
+def _parallel_exact_schedules(tasks, workers, budget=None, max_days=None):
+    """Search the subtrees of the most constrained sigle's sections in a process pool.
+
+    Subtrees are merged in branching order, so the result is the same list, in
+    the same order, as the sequential search. Once the budget's deadline
+    passes, the workers are told to stop, queued subtrees are dropped and only
+    the subtrees already finished are returned.
+    """
+    tasks, conflicts = _prepare_search(tasks)
+    roots = []
+    candidates = _initial_candidates(tasks)
+    if candidates:
+        options = candidates[_most_constrained(candidates)]
+        while options:
+            roots.append((options & -options).bit_length() - 1)
+            options &= options - 1
+
+    task_data = [(task.name, task.day_times) for task in tasks]
+    max_nodes = deadline = None
+    if budget is not None:
+        if budget.max_nodes is not None:
+            max_nodes = max(budget.max_nodes - budget.nodes, 0) // max(len(roots), 1)
+        if budget.deadline is not None:
+            # Monotonic clocks are per process: hand the workers a wall-clock deadline
+            deadline = time.time() + budget.deadline - time.monotonic()
+
+    executor, manager = _get_executor(workers)
+    stop = manager.Event()
+    futures = [executor.submit(_search_subtree, task_data, root, max_nodes, deadline, stop, max_days)
+               for root in roots]
+    pending = set(futures)
+    while pending:
+        _, pending = wait(pending, timeout=PARALLEL_POLL_INTERVAL if budget is not None else None,
+                          return_when=FIRST_COMPLETED)
+        if pending and budget is not None and budget.expired():
+            # Queued subtrees are dropped; running ones stop within CHECK_EVERY nodes and keep what they found
+            stop.set()
+            for future in pending:
+                future.cancel()
+            _, pending = wait(pending, timeout=PARALLEL_POLL_INTERVAL)
+            budget.truncated = True
+            break
+
+    results = []
+    for future in futures:
+        if future in pending or future.cancelled():
+            continue
+        schedules, counters, truncated = future.result()
+        results.extend(schedules)
+        if budget is not None:
+            budget.add(counters)
+            budget.truncated = budget.truncated or truncated
+    return results
+
+# Ranking objectives: each maps the meetings of a schedule to a cost, lower is better
+NOON = 12 * 60
+
+def _day_spans(day_times):
+    # Per campus day: (first start, last end, idle minutes between meetings)
+    meetings = {}
+    for day, start, end in day_times:
+        if day in DAY_INDEX and 0 <= start < end:
+            meetings.setdefault(day, []).append((start, end))
+    spans = {}
+    for day, intervals in meetings.items():
+        intervals.sort()
+        first, last = intervals[0]
+        idle = 0
+        for start, end in intervals[1:]:
+            if start > last:
+                idle += start - last
+            last = max(last, end)
+        spans[day] = (first, last, idle)
+    return spans
+
+def campus_days(day_times):
+    return len(_day_spans(day_times))
+
+def idle_minutes(day_times):
+    return sum(idle for _, _, idle in _day_spans(day_times).values())
+
+def morning_minutes(day_times):
+    # Minutes of class days starting before noon: favours late starts
+    return sum(max(0, NOON - first) for first, _, _ in _day_spans(day_times).values())
+
+def evening_minutes(day_times):
+    # Minutes of class days ending after noon: favours early finishes
+    return sum(max(0, last - NOON) for _, last, _ in _day_spans(day_times).values())
+
+OBJECTIVES = {
+    'days': campus_days,
+    'gaps': idle_minutes,
+    'start': morning_minutes,
+    'finish': evening_minutes,
+}
+# Objectives that can only grow as sections are added: their partial value is a lower bound
+MONOTONE_OBJECTIVES = {'days', 'start', 'finish'}
+
+def rank_schedules(tasks, rank_by, top_k, budget=None, max_days=None):
+    """Return the *top_k* best exact schedules, ordered by the objectives in *rank_by*.
+
+    Objectives are compared lexicographically. A bounded heap keeps the K best
+    schedules seen so far, and partial schedules whose lower bound cannot beat
+    the current K-th best are pruned with their whole subtree.
+    """
+    objectives = [OBJECTIVES[name] for name in rank_by]
+    monotone = [name in MONOTONE_OBJECTIVES for name in rank_by]
+    tasks, conflicts = _prepare_search(tasks)
+    heap = []  # max-heap of (negated score, -sequence, names): heap[0] is the current K-th best
+
+    def score(schedule):
+        day_times = [day_time for task in schedule for day_time in task.day_times]
+        return tuple(objective(day_times) for objective in objectives)
+
+    def prune(schedule):
+        if len(heap) < top_k:
+            return False
+        day_times = [day_time for task in schedule for day_time in task.day_times]
+        bound = tuple(objective(day_times) if is_monotone else 0
+                      for objective, is_monotone in zip(objectives, monotone))
+        return bound >= tuple(-value for value in heap[0][0])
+
+    for sequence, schedule in enumerate(_search_exact(tasks, conflicts, prune, budget, max_days=max_days)):
+        entry = (tuple(-value for value in score(schedule)), -sequence, sorted(task.name for task in schedule))
+        if len(heap) < top_k:
+            heapq.heappush(heap, entry)
+        elif entry > heap[0]:
+            heapq.heapreplace(heap, entry)
+
+    return [names for _, _, names in sorted(heap, reverse=True)]
+
+CachedSchedules = namedtuple('CachedSchedules', ['schedules', 'exhausted'])
+
+class ScheduleCache:
+    """Bounded LRU + TTL cache of solver results, tied to the catalog state they came from.
+
+    Values are ``CachedSchedules``: a prefix of the result list in solver order
+    and whether that prefix is the complete result. Each entry records the
+    ``SeasonIndex.version`` it was computed on and is only returned for that
+    version: while the catalog reloads, threads still on the old state neither
+    see nor overwrite results for the new one. Entries of older states age out.
+    """
+
+    def __init__(self, max_entries, ttl):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()  # (version, key) -> (expires_at, CachedSchedules)
+        self._lock = threading.Lock()
+
+    def get(self, version, key):
+        key = (version, key)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] < time.monotonic():
+                self._entries.pop(key, None)
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def put(self, version, key, schedules, exhausted):
+        key = (version, key)
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl, CachedSchedules(schedules, exhausted))
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def stats(self):
+        with self._lock:
+            return {'hits': self.hits, 'misses': self.misses, 'size': len(self._entries)}
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+Meeting = namedtuple('Meeting', ['name', 'sigle', 'group', 'day', 'day_index', 'start', 'end',
+                                 'start_time', 'end_time', 'dates', 'location', 'type', 'teacher'])
+
+def _parse_minutes(value):
+    """'18h00', '18:00', '18h' or '18' -> minutes since midnight (ValueError otherwise)."""
+    match = re.fullmatch(r'\s*(\d{1,2})\s*(?:[h:]\s*(\d{2})?)?\s*', value)
+    if not match or int(match[2] or 0) > 59:
+        raise ValueError(value)
+    minutes = int(match[1]) * 60 + int(match[2] or 0)
+    if minutes > MINUTES_PER_DAY:
+        raise ValueError(value)
+    return minutes
+
+def _search_key(value):
+    return ' '.join(value.split()).casefold() if value else None
+
+class MeetingIndex:
+    """Interval index over the meetings of one season, for /search_sections.
+
+    The meetings of each day are kept sorted by start minute, so a time window
+    is two bisections plus a check of the end minutes inside it; sigle,
+    location, type and teacher filters are hash lookups. Filters are
+    intersected smallest first.
+    """
+
+    FIELDS = ('sigle', 'location', 'type', 'teacher')
+
+    def __init__(self, meetings):
+        self.meetings = meetings
+        self.section_sizes = {}
+        self.by_field = {field: {} for field in self.FIELDS}
+        by_day = {}
+        for i, meeting in enumerate(meetings):
+            self.section_sizes[meeting.name] = self.section_sizes.get(meeting.name, 0) + 1
+            for field in self.FIELDS:
+                self.by_field[field].setdefault(_search_key(getattr(meeting, field)), set()).add(i)
+            # Meetings without a weekday or a valid time range never match a day or time filter
+            if meeting.day_index is not None and meeting.start is not None and meeting.end is not None:
+                by_day.setdefault(meeting.day_index, []).append((meeting.start, meeting.end, i))
+        self.by_day = {}
+        for day, entries in by_day.items():
+            entries.sort()
+            starts, ends, ids = zip(*entries)
+            self.by_day[day] = (starts, ends, ids)
+
+    def _in_window(self, days, after, before):
+        matches = set()
+        for day in days:
+            if day not in self.by_day:
+                continue
+            starts, ends, ids = self.by_day[day]
+            lo = bisect.bisect_left(starts, after) if after is not None else 0
+            hi = bisect.bisect_right(starts, before) if before is not None else len(starts)
+            matches.update(ids[i] for i in range(lo, hi) if before is None or ends[i] <= before)
+        return matches
+
+    def search(self, days=None, after=None, before=None, filters=None, whole_sections=False):
+        """Return {section name: [matching meetings]}.
+
+        *filters* maps a field of FIELDS to accepted values (any of them
+        matches). A meeting matches when it is on one of *days* and lies
+        within [after, before]; with *whole_sections* a section is only
+        returned when every one of its meetings matches.
+        """
+        candidates = []
+        if days or after is not None or before is not None:
+            candidates.append(self._in_window(days or self.by_day, after, before))
+        for field, values in (filters or {}).items():
+            index = self.by_field[field]
+            candidates.append(set().union(*(index.get(_search_key(value), ()) for value in values)))
+
+        if candidates:
+            candidates.sort(key=len)
+            matches = candidates[0].intersection(*candidates[1:])
+        else:
+            matches = range(len(self.meetings))
+
+        sections = {}
+        for i in sorted(matches):
+            meeting = self.meetings[i]
+            sections.setdefault(meeting.name, []).append(meeting)
+        if whole_sections:
+            sections = {name: found for name, found in sections.items()
+                        if len(found) == self.section_sizes[name]}
+        return sections
+
+def _read_meetings_from_db(season):
+    conn = get_db_connection()
+    rows = conn.execute("""
+        SELECT Name, Sigle, Group_Number, Day, Day_Index, Start_Minute, End_Minute,
+               Start_Time, End_Time, Dates, Location, Type, Teacher
+        FROM tasks_table
+        WHERE Season = ?
+        ORDER BY Name, Day_Index, Start_Minute
+    """, (season,)).fetchall()
+    close_db_connection(conn)
+    return [Meeting(*row) for row in rows]
+
+class SectionSearch:
+    """One MeetingIndex per season, built on first use and dropped when the database changes."""
+
+    def __init__(self):
+        self._version = None
+        self._indexes = {}
+        self._lock = threading.Lock()
+
+    def season(self, season):
+        with self._lock:
+            version = db_version()
+            if version != self._version:
+                self._indexes = {}
+                self._version = version
+            index = self._indexes.get(season)
+            if index is None:
+                with timed('db_load'):
+                    index = self._indexes[season] = MeetingIndex(_read_meetings_from_db(season))
+            return index
+
+schedule_cache = ScheduleCache(app.config['SCHEDULE_CACHE_SIZE'], app.config['SCHEDULE_CACHE_TTL'])
+section_search = SectionSearch()
+
+catalog = Catalog(app.config['CATALOG_MAX_SEASONS'])
+# Solver worker processes import this module too, but never use the catalog
+if multiprocessing.parent_process() is None and (db_version() is not None or snapshot_version() is not None):
+    catalog.load()
+
+BLOCKED_WINDOW_RE = re.compile(r'\s*(?:([^\W\d]+)\s+)?([\dh:]+)\s*-\s*([\dh:]+)\s*')
+
+def _parse_day(value):
+    day = value.strip().capitalize()
+    if day not in DAY_INDEX:
+        raise ValueError(f'Unknown day: {value}')
+    return day
+
+def _parse_constraints(form):
+    """ScheduleConstraints from the blocked, forbidden_days and max_days fields, or None.
+
+    blocked is a ';'-separated list of windows such as 'Lundi 8h00-10h00', or
+    '0h00-10h00' for every day; forbidden_days is a comma-separated list and
+    may be repeated. ValueError carries the message for the client.
+    """
+    blocked = []
+    for window in filter(str.strip, form.get('blocked', '').split(';')):
+        match = BLOCKED_WINDOW_RE.fullmatch(window)
+        if not match:
+            raise ValueError(f'Invalid blocked window: {window} (expected e.g. Lundi 8h00-10h00)')
+        try:
+            start, end = _parse_minutes(match[2]), _parse_minutes(match[3])
+        except ValueError as exc:
+            raise ValueError(f'Invalid time: {exc} (expected e.g. 18h00)')
+        if end <= start:
+            raise ValueError(f'Invalid blocked window: {window} (ends before it starts)')
+        blocked.append((_parse_day(match[1]) if match[1] else None, start, end))
+    forbidden_days = [_parse_day(day) for days in form.getlist('forbidden_days')
+                      for day in days.split(',') if day.strip()]
+    max_days = form.get('max_days', '').strip() or None
+    if max_days is not None:
+        if not max_days.isdigit() or int(max_days) < 1:
+            raise ValueError(f'Invalid max_days: {max_days} (expected a number of days, at least 1)')
+        max_days = int(max_days)
+    if not blocked and not forbidden_days and max_days is None:
+        return None
+    return ScheduleConstraints(blocked, forbidden_days, max_days)
+
+def _record_search(budget):
+    for name, value in budget.counters().items():
+        metrics.inc(f'uqam_solver_{name}_total', value)
+    if budget.truncated:
+        metrics.inc('uqam_solver_truncated_total')
+
+def _cache_results(version, key, schedules, exhausted, budget):
+    # Truncated or oversized results are not worth keeping
+    if not budget.truncated and len(schedules) <= app.config['SCHEDULE_CACHE_MAX_SCHEDULES']:
+        schedule_cache.put(version, key, schedules, exhausted)
+
 @app.route('/')
 def index():
     return render_template('index.html')
 
 @app.route('/schedule', methods=['GET', 'POST'])
+@profiled
 def create_schedule():
     if request.method == 'POST':
-        sigles = request.form['sigles'].split(',')
+        sigles = {sigle.strip().upper() for sigle in request.form['sigles'].split(',') if sigle.strip()}
         season = request.form['season']
-        min_length = len(sigles)
 
-        tasks = read_tasks_from_db(season)
-        tasks = [task for task in tasks if any(sigle.upper() in task.name for sigle in sigles)]        
-        possible_schedules = find_possible_schedules(tasks)
+        # Malformed requests are rejected whether or not the sigles are offered
+        try:
+            constraints = _parse_constraints(request.form)
+        except ValueError as exc:
+            return jsonify({'error': str(exc)}), 400
+        rank_by = [name.strip() for name in request.form.get('rank', '').split(',') if name.strip()]
+        unknown = [name for name in rank_by if name not in OBJECTIVES]
+        if unknown:
+            return jsonify({'error': f"Unknown ranking objective(s): {', '.join(unknown)}"}), 400
 
-        ret_schedules = []
-        for schedule in possible_schedules:
-            if len(schedule) >= min_length:
-                ret_schedules.append(schedule)
+        with timed('catalog'):
+            season_index = catalog.season(season)
+        if not sigles or season_index is None or not sigles <= season_index.sigles():
+            # A requested sigle is not offered this season: no full schedule can exist
+            return jsonify({'schedules': [], 'next_cursor': None, 'complete': True, 'nodes': 0})
+
+        with timed('filter'):
+            tasks = [task for sigle in sorted(sigles) for task in season_index.sections(sigle)]
+
+        budget = SearchBudget(app.config['SCHEDULE_NODE_BUDGET'], app.config['SCHEDULE_TIMEOUT'])
+        limit = request.form.get('limit', type=int)
+        next_cursor = None
+        # Same season and sigle set -> same results, whatever the order or case they were typed in
+        cache_key = (season.strip().lower(), tuple(sorted(sigles)))
+        if constraints is not None:
+            cache_key += ('constraints',) + constraints.key()
+        if rank_by:
+            top_k = min(max(request.form.get('top_k', 10, type=int), 1), MAX_TOP_K)
+            cache_key += ('rank', tuple(rank_by), top_k)
+            cached = schedule_cache.get(season_index.version, cache_key)
+            if cached is not None:
+                schedules = cached.schedules
+            else:
+                with timed('search'):
+                    schedules = find_possible_schedules(tasks, rank_by=rank_by, top_k=top_k, budget=budget,
+                                                        constraints=constraints)
+                _cache_results(season_index.version, cache_key, schedules, True, budget)
+        elif not limit or limit <= 0:
+            # Without a limit every schedule is returned at once, as before
+            cached = schedule_cache.get(season_index.version, cache_key)
+            if cached is not None and cached.exhausted:
+                schedules = cached.schedules
+            else:
+                with timed('search'):
+                    schedules = find_possible_schedules(tasks, exact=True, budget=budget,
+                                                        workers=app.config['PARALLEL_WORKERS'],
+                                                        constraints=constraints)
+                _cache_results(season_index.version, cache_key, schedules, True, budget)
+        else:
+            # Paged mode: only compute up to the end of the requested page (plus one to know if more exist)
+            cursor = max(request.form.get('cursor', 0, type=int), 0)
+            end = cursor + limit + 1
+            cached = schedule_cache.get(season_index.version, cache_key)
+            if cached is not None and (cached.exhausted or len(cached.schedules) >= end):
+                prefix = cached.schedules
+            else:
+                # Each search restarts from the root, so search ahead: doubling the cached
+                # prefix keeps paging through n schedules at O(n) work instead of O(n^2)
+                ahead = max(end, 2 * len(cached.schedules) if cached is not None else 0)
+                ahead = min(ahead, max(end, app.config['SCHEDULE_CACHE_MAX_SCHEDULES']))
+                with timed('search'):
+                    prefix = list(islice(iter_schedules(tasks, budget, constraints), ahead))
+                _cache_results(season_index.version, cache_key, prefix, len(prefix) < ahead, budget)
+            page = prefix[cursor:end]
+            schedules = page[:limit]
+            if len(page) > limit:
+                next_cursor = cursor + limit
 
-        return jsonify({'schedules': ret_schedules})
+        _record_search(budget)
+        with timed('serialize'):
+            return jsonify({'schedules': schedules, 'next_cursor': next_cursor,
+                            'complete': not budget.truncated, 'nodes': budget.nodes})
     else:
         return index()
 
+@app.route('/schedule_cache', methods=['GET'])
+def get_schedule_cache_stats():
+    return jsonify(schedule_cache.stats())
+
+@app.route('/metrics', methods=['GET'])
+def get_metrics():
+    cache = schedule_cache.stats()
+    extra = [(('uqam_schedule_cache_hits_total', ()), cache['hits']),
+             (('uqam_schedule_cache_misses_total', ()), cache['misses'])]
+    return metrics.render(extra), 200, {'Content-Type': 'text/plain; version=0.0.4; charset=utf-8'}
+
+@app.route('/search_sections', methods=['GET'])
+def search_sections():
+    """Sections of a season filtered by day, time window, sigle, location, type and teacher.
+
+    ?season=automne2025&day=Mardi&after=18h00 lists what is offered on
+    Tuesday evenings; add before=..., mode=all and several day=... to list
+    the sections that fit entirely in free slots. location, type, teacher
+    and sigles accept several values; text matching ignores case.
+    """
+    season = request.args.get('season', '').strip().lower()
+    if not season:
+        return jsonify({'error': 'Season is required'}), 400
+
+    days = []
+    for day in request.args.getlist('day'):
+        index = DAY_INDEX.get(day.strip().capitalize())
+        if index is None:
+            return jsonify({'error': f'Unknown day: {day}'}), 400
+        days.append(index)
+    try:
+        after, before = (_parse_minutes(request.args[key]) if request.args.get(key) else None
+                         for key in ('after', 'before'))
+    except ValueError as exc:
+        return jsonify({'error': f'Invalid time: {exc} (expected e.g. 18h00)'}), 400
+    mode = request.args.get('mode', 'any')
+    if mode not in ('any', 'all'):
+        return jsonify({'error': "mode must be 'any' or 'all'"}), 400
+
+    filters = {field: [value for value in request.args.getlist(field) if value.strip()]
+               for field in ('location', 'type', 'teacher')}
+    filters['sigle'] = [sigle.strip().upper() for sigles in request.args.getlist('sigles')
+                        for sigle in sigles.split(',') if sigle.strip()]
+    filters = {field: values for field, values in filters.items() if values}
+    limit = min(max(request.args.get('limit', 100, type=int), 1), MAX_SEARCH_RESULTS)
+
+    # Only seasons the catalog offers get an index
+    if catalog.season(season) is None:
+        return jsonify({'sections': [], 'total': 0, 'truncated': False})
+    index = section_search.season(season)
+    with timed('search'):
+        sections = index.search(days, after, before, filters, whole_sections=mode == 'all')
+
+    with timed('serialize'):
+        return jsonify({
+            'sections': [{
+                'name': name,
+                'sigle': meetings[0].sigle,
+                'group': meetings[0].group,
+                'meetings': [{'day': m.day, 'start_time': m.start_time, 'end_time': m.end_time,
+                              'dates': m.dates, 'location': m.location, 'type': m.type,
+                              'teacher': m.teacher} for m in meetings],
+            } for name, meetings in islice(sections.items(), limit)],
+            'total': len(sections),
+            'truncated': len(sections) > limit,
+        })
+
 @app.route('/class_details', methods=['GET'])
 def get_class_details():
-    class_name = request.args.get('class_name')
-    if not class_name:
+    # Several class_name parameters fetch a whole schedule in one round trip
+    class_names = list(dict.fromkeys(name for name in request.args.getlist('class_name') if name))
+    if not class_names:
         return jsonify({'error': 'Class name is required'}), 400
+    if len(class_names) > MAX_CLASS_DETAILS:
+        return jsonify({'error': f'At most {MAX_CLASS_DETAILS} class names per request'}), 400
 
-    conn = get_db_connection()
-    cursor = conn.cursor()
-    
-    # Query the database for the specific class name
-    query = """
-        SELECT Name, Day, Group_Number, Dates, Start_Time, End_Time, Location, Type, Teacher
-        FROM tasks_table
-        WHERE Name = ?
-    """
-    cursor.execute(query, (class_name,))
-    rows = cursor.fetchall()
+    with timed('db_query'):
+        conn = get_db_connection()
+        cursor = conn.cursor()
 
-    close_db_connection(conn)
+        # Query the database for all the requested class names at once
+        query = f"""
+            SELECT Name, Day, Group_Number, Dates, Start_Time, End_Time, Location, Type, Teacher
+            FROM tasks_table
+            WHERE Name IN ({', '.join('?' * len(class_names))})
+            ORDER BY Name
+        """
+        cursor.execute(query, class_names)
+        rows = cursor.fetchall()
+
+        close_db_connection(conn)
 
     # Check if the class was found
     if not rows:
@@ -156,7 +1409,8 @@ def get_class_details():
             'teacher': row['Teacher']
         })
 
-    return jsonify({'class_details': class_details})
+    with timed('serialize'):
+        return jsonify({'class_details': class_details})
 
 if __name__ == '__main__':
     app.run()
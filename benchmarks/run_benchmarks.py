@@ -0,0 +1,204 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+benchmarks/run_benchmarks.py
+----------------------------
+
+Reproducible timings for the solver, the catalog loaders and the Flask
+endpoints, measured on a synthetic catalog (see synthetic_catalog.py):
+
+1. Generates the catalog CSV for the chosen scenario in a temporary
+   static/data/ folder and builds database.db + catalog.bin from it with
+   the regular scripts/ pipeline.
+2. Points the app at that database and times every benchmark
+   (median / min over --repeat runs).
+3. Writes the results as JSON (--output) and compares them with a stored
+   baseline (--baseline): any benchmark slower than the baseline by more
+   than --tolerance makes the run exit with status 1.
+
+    python benchmarks/run_benchmarks.py --scenario medium
+    python benchmarks/run_benchmarks.py --scenario medium --save-baseline
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from itertools import islice
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+sys.path.insert(0, str(ROOT / "benchmarks"))
+
+from synthetic_catalog import sigle_name, write_catalog  # noqa: E402
+
+# --------------------------------------------------------------------------- #
+#  Configuration                                                              #
+# --------------------------------------------------------------------------- #
+SEASON = "automne2025"
+
+SCENARIOS = {
+    # catalog shape                                            + sigles per request
+    "small":  dict(n_sigles=200,  groups=4,  meetings=1, density=0.3, request=4),
+    "medium": dict(n_sigles=1000, groups=6,  meetings=2, density=0.5, request=6),
+    "large":  dict(n_sigles=3000, groups=10, meetings=2, density=0.6, request=6),
+}
+
+PAGE_SIZE = 25
+TOP_K     = 10
+
+
+# --------------------------------------------------------------------------- #
+#  Helpers                                                                    #
+# --------------------------------------------------------------------------- #
+def build_data(workdir: Path, params: dict) -> None:
+    """Write the synthetic CSV and build the database + snapshot from it."""
+    data_dir = workdir / "static" / "data"
+    write_catalog(data_dir / "data_uqam.csv", season=SEASON, **params)
+    # the build scripts use paths relative to the repository root
+    for script in ("convert_csv_to_sql.py", "build_catalog_snapshot.py"):
+        subprocess.run([sys.executable, str(ROOT / "scripts" / script)],
+                       cwd=workdir, check=True, stdout=subprocess.DEVNULL)
+
+
+def timeit(fn, repeat: int) -> dict:
+    fn()                                            # warm-up
+    runs = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        runs.append(time.perf_counter() - start)
+    return {"median": statistics.median(runs), "min": min(runs), "repeat": repeat}
+
+
+def benchmarks(app_module, params: dict) -> dict:
+    """Return {name: zero-argument callable} for the scenario."""
+    app = app_module.app
+    catalog = app_module.catalog
+    client = app.test_client()
+
+    rng = random.Random(0)
+    sigles = sorted(sigle_name(i) for i in rng.sample(range(params["n_sigles"]), params["request"]))
+    form = {"sigles": ",".join(sigles), "season": SEASON}
+    season_index = catalog.season(SEASON)
+    tasks = [task for sigle in sigles for task in season_index.sections(sigle)]
+    first = app_module.find_possible_schedules(tasks, rank_by=["days"], top_k=1)
+    details = "&".join(f"class_name={name}" for name in (first[0] if first else []))
+
+    def post(**extra):
+        def run():
+            app_module.schedule_cache.clear()       # time the search, not the cache
+            client.post("/schedule", data={**form, **extra})
+        return run
+
+    return {
+        "overlaps_with":         lambda: [a.overlaps_with(b) for a in tasks for b in tasks],
+        "solver_exact":          lambda: app_module.find_possible_schedules(tasks, exact=True),
+        "solver_first_page":     lambda: list(islice(app_module.iter_schedules(tasks), PAGE_SIZE)),
+        "solver_ranked":         lambda: app_module.find_possible_schedules(
+                                     tasks, rank_by=["days", "gaps"], top_k=TOP_K),
+        "load_season_db":        lambda: app_module.read_tasks_from_db(SEASON),
+        "load_catalog_db":       catalog._load_database,
+        "load_catalog_snapshot": catalog._load_snapshot,
+        "endpoint_schedule":        post(),
+        "endpoint_schedule_page":   post(limit=PAGE_SIZE, cursor=0),
+        "endpoint_schedule_ranked": post(rank="days,gaps", top_k=TOP_K),
+        "endpoint_class_details":   lambda: client.get(f"/class_details?{details}"),
+    }
+
+
+def compare(results: dict, baseline: dict, tolerance: float) -> list[str]:
+    """Print a comparison table and return the names of regressed benchmarks."""
+    regressions = []
+    print(f"\n{'benchmark':<28}{'median':>12}{'baseline':>12}{'ratio':>8}")
+    for name, result in results.items():
+        base = baseline.get(name)
+        if base is None:
+            print(f"{name:<28}{result['median'] * 1000:>10.2f}ms{'-':>12}{'-':>8}")
+            continue
+        ratio = result["median"] / base["median"] if base["median"] else float("inf")
+        flag = ""
+        if ratio > 1 + tolerance:
+            regressions.append(name)
+            flag = "  <-- regression"
+        print(f"{name:<28}{result['median'] * 1000:>10.2f}ms"
+              f"{base['median'] * 1000:>10.2f}ms{ratio:>8.2f}{flag}")
+    return regressions
+
+
+# --------------------------------------------------------------------------- #
+#  Main driver                                                                #
+# --------------------------------------------------------------------------- #
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Benchmark the scheduler on a synthetic catalog")
+    parser.add_argument("--scenario", choices=sorted(SCENARIOS), default="medium")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--output", type=Path, default=ROOT / "benchmarks" / "latest.json")
+    parser.add_argument("--baseline", type=Path,
+                        help="baseline file (default: benchmarks/baseline-<scenario>.json)")
+    parser.add_argument("--tolerance", type=float, default=0.25,
+                        help="allowed slowdown vs. the baseline (0.25 = 25%%)")
+    parser.add_argument("--save-baseline", action="store_true",
+                        help="store this run as the new baseline")
+    args = parser.parse_args()
+    baseline_path = args.baseline or ROOT / "benchmarks" / f"baseline-{args.scenario}.json"
+
+    params = SCENARIOS[args.scenario]
+    catalog_params = {k: v for k, v in params.items() if k != "request"}
+
+    with tempfile.TemporaryDirectory() as tmp:
+        workdir = Path(tmp)
+        print(f"Building the '{args.scenario}' synthetic catalog…")
+        build_data(workdir, catalog_params)
+
+        import app as app_module
+        data_dir = workdir / "static" / "data"
+        app_module.app.config["DATABASE"] = str(data_dir / "database.db")
+        app_module.app.config["CATALOG_SNAPSHOT"] = str(data_dir / "catalog.bin")
+        app_module.app.config["PARALLEL_WORKERS"] = 1   # measure the algorithm, not the host
+        app_module.catalog.load()
+
+        results = {}
+        for name, fn in benchmarks(app_module, params).items():
+            results[name] = timeit(fn, args.repeat)
+            print(f"  {name:<28}{results[name]['median'] * 1000:>10.2f}ms")
+
+    report = {
+        "scenario": args.scenario,
+        "params":   params,
+        "python":   platform.python_version(),
+        "machine":  platform.machine(),
+        "results":  results,
+    }
+    args.output.parent.mkdir(parents=True, exist_ok=True)
+    args.output.write_text(json.dumps(report, indent=2), encoding="utf-8")
+    print(f"\nWrote results to {args.output}")
+
+    if args.save_baseline:
+        baseline_path.write_text(json.dumps(report, indent=2), encoding="utf-8")
+        print(f"Saved baseline to {baseline_path}")
+        return 0
+
+    if not baseline_path.exists():
+        print(f"No baseline at {baseline_path} – run with --save-baseline to create one.")
+        return 0
+
+    baseline = json.loads(baseline_path.read_text(encoding="utf-8"))
+    regressions = compare(results, baseline["results"], args.tolerance)
+    if regressions:
+        print(f"\n{len(regressions)} benchmark(s) regressed: {', '.join(regressions)}")
+        return 1
+    print("\nNo regression.")
+    return 0
+
+
+# --------------------------------------------------------------------------- #
+if __name__ == "__main__":
+    sys.exit(main())
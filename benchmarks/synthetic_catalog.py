@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+benchmarks/synthetic_catalog.py
+-------------------------------
+
+Writes a synthetic course catalog in the exact format of
+static/data/data_uqam.csv (no header, one row per meeting):
+
+    Name,Group Number,Day,Dates,Start Time,End Time,Location,Type,Teacher
+
+The shape of the catalog is controlled by the number of sigles, groups per
+sigle, meetings per group and a conflict density in [0, 1]: the higher the
+density, the fewer distinct (day, time slot) combinations the meetings are
+drawn from, so the more sections overlap.
+
+    python benchmarks/synthetic_catalog.py out.csv --sigles 200 --groups 6
+"""
+from __future__ import annotations
+
+import argparse
+import csv
+import math
+import random
+from pathlib import Path
+
+DAYS    = ["Lundi", "Mardi", "Mercredi", "Jeudi", "Vendredi"]
+SLOTS   = [("08h30", "11h30"), ("09h00", "12h00"), ("09h30", "12h30"),
+           ("12h30", "15h30"), ("14h00", "17h00"), ("15h30", "18h30"),
+           ("18h00", "21h00"), ("18h30", "21h30")]
+TYPES   = ["Cours magistral", "Atelier", "Exercices", "Laboratoire"]
+DATES   = "Du 2 septembre 2025au 15 décembre 2025"
+CAMPUS  = "Campus de Montréal"
+LETTERS = "ABCDEFGHIJKLMNOPQRSTUVWXYZ"
+
+
+def sigle_name(index: int) -> str:
+    """Return a sigle that looks real (ABC1234) and sorts like its index."""
+    prefix = LETTERS[index // (26 * 10000) % 26] + LETTERS[index // 10000 % 26]
+    return f"S{prefix}{index % 10000:04d}"
+
+
+def generate_rows(n_sigles: int, groups: int, meetings: int, density: float,
+                  season: str = "automne2025", seed: int = 0) -> list[list[str]]:
+    """Return the CSV rows of a synthetic catalog."""
+    rng = random.Random(seed)
+    combos = [(day, slot) for slot in SLOTS for day in DAYS]
+    pool = combos[:max(1, math.ceil(len(combos) * (1.0 - density)))]
+
+    rows = []
+    for s in range(n_sigles):
+        sigle = sigle_name(s)
+        for g in range(min(groups, len(LETTERS))):
+            name = f"{sigle}-{season}-{LETTERS[g]}"
+            teacher = f"Enseignant {rng.randrange(n_sigles * 2)}"
+            for day, (start, end) in rng.sample(pool, min(meetings, len(pool))):
+                rows.append([name, f"{g + 10:03d}", day, DATES, start, end,
+                             CAMPUS, rng.choice(TYPES), teacher])
+    return rows
+
+
+def write_catalog(path: Path, **params) -> int:
+    """Write a synthetic catalog to *path* and return the number of rows."""
+    rows = generate_rows(**params)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with path.open("w", newline="", encoding="utf-8") as fh:
+        csv.writer(fh).writerows(rows)
+    return len(rows)
+
+
+# --------------------------------------------------------------------------- #
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("output", type=Path)
+    parser.add_argument("--sigles", type=int, default=500)
+    parser.add_argument("--groups", type=int, default=4)
+    parser.add_argument("--meetings", type=int, default=1)
+    parser.add_argument("--density", type=float, default=0.5)
+    parser.add_argument("--season", default="automne2025")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    n = write_catalog(args.output, n_sigles=args.sigles, groups=args.groups,
+                      meetings=args.meetings, density=args.density,
+                      season=args.season, seed=args.seed)
+    print(f"Wrote {n} rows to {args.output}")
@@ -1,9 +1,12 @@
-import sys, os
+import argparse
+import asyncio
+import csv
+import os
+import re
 import subprocess
-from pathlib import Path
-from shutil import which
-import requests, re
+import sys
 from datetime import datetime
+from pathlib import Path
 
 # --------------------------------------------------------------------------- #
 #  Configuration – portable (works on Windows, macOS, Linux)
@@ -15,34 +18,24 @@ BASE_DIR     = Path("static", "data")
 SCRAPERS_DIR = Path("scrapers")
 SCRIPTS_DIR  = Path("scripts")
 
-# individual files / scripts
-SCRIPT_SCRAPE_PROGRAMMES = SCRAPERS_DIR / "scrape_programmes_uqam.py"
-SCRIPT_SCRAPE_COURS      = SCRAPERS_DIR / "scrape_cours_uqam.py"
-SCRIPT_CSV_TO_SQL        = SCRIPTS_DIR  / "convert_csv_to_sql.py"
-SCRIPT_SIGLES_TO_JSON    = SCRIPTS_DIR  / "sigles_to_json.py"
+# the scrapers and build scripts run in this process
+sys.path[:0] = [str(SCRAPERS_DIR.resolve()), str(SCRIPTS_DIR.resolve())]
+import scrape_cours_uqam                                       # noqa: E402
+import scrape_programmes_uqam                                  # noqa: E402
+from build_catalog_snapshot import build_snapshot              # noqa: E402
+from convert_csv_to_sql import build_database                  # noqa: E402
+from sigles_to_json import text_to_json                        # noqa: E402
 
-RAW_COURS   = BASE_DIR / "raw_liste_cours.txt"
+# individual files
 CLEAN_COURS = BASE_DIR / "liste_cours.txt"
-RAW_DATA    = BASE_DIR / "raw_data_uqam.csv"
-CLEAN_DATA  = BASE_DIR / "data_uqam.csv"
-VAR_CONTENT = BASE_DIR / "contenu_variable.html"
+COURS_JSON  = BASE_DIR / "cours_uqam.json"
+RAW_DATA    = scrape_cours_uqam.OUTPUT_CSV
+RAW_JOURNAL = scrape_cours_uqam.JOURNAL_FILE
 DB_FILE     = BASE_DIR / "database.db"
+SNAPSHOT    = BASE_DIR / "catalog.bin"
 
 APP = "app.py"
 
-# --------------------------------------------------------------------------- #
-#  Helper: choose powershell / pwsh
-# --------------------------------------------------------------------------- #
-def _detect_powershell() -> str:
-    """Return the full path to powershell.exe or pwsh.exe, preferring pwsh."""
-    for exe in ("pwsh", "powershell"):
-        path = which(exe)
-        if path:
-            return path
-    sys.exit("ERROR: neither 'pwsh' nor 'powershell' executable was found.")
-
-POWERSHELL = _detect_powershell()
-
 # --------------------------------------------------------------------------- #
 #  Helper: run a command and stream its output live
 # --------------------------------------------------------------------------- #
@@ -79,98 +72,65 @@ def run_cmd(cmd):
         print(f"\nCommand failed with exit-code {proc.returncode}", file=sys.stderr)
         sys.exit(proc.returncode)
 
-# --------------------------------------------------------------------------- #
-#  PowerShell one-liners
-# --------------------------------------------------------------------------- #
-
-def ps_command(script: str):
-    """
-    Wrap a PowerShell script string so it can be passed to run_cmd().
-    The -NoProfile switch keeps execution quick and deterministic.
-    """
-    return [POWERSHELL, "-NoProfile", "-Command", script]
-
 # ──────────────────────────────────────────────────────────────────────────── #
 #  Tasks
 # ──────────────────────────────────────────────────────────────────────────── #
 
-def scrape_programmes():
-    print("\n=== Scraping programme list ===")
-    run_cmd([PYTHON, SCRIPT_SCRAPE_PROGRAMMES])
-
-    # ------------------------------------------------------------------ #
-    #  Build a unique course-sigle list  (grep | sort | uniq)
-    #  PowerShell:  Get-Content -> Select-String -> Sort-Object -Unique
-    # ------------------------------------------------------------------ #
-    if os.path.exists(CLEAN_COURS):
-        os.remove(CLEAN_COURS)
-
-    # ------------------------------------------------------------------ #
-    #  Build a unique course-code list  (regex → sort-unique)
-    # ------------------------------------------------------------------ #
-    ps_extract = f"""
-        Get-Content '{RAW_COURS}' |
-        Select-String -Pattern '[A-Z]{{3}}[0-9]{{4}}' -AllMatches |
-        ForEach-Object {{ $_.Matches.Value }} |
-        Sort-Object -Unique |
-        Set-Content '{CLEAN_COURS}'          # ← no -NoNewline here
-    """
-    run_cmd(ps_command(ps_extract))
-
-    # ------------------------------------------------------------------ #
-    #  contenu-variable  (this part already used pure Python = unchanged)
-    # ------------------------------------------------------------------ #
-    print("Scraping contenu variable…")
-
-    url = "https://etudier.uqam.ca/cours-contenu-variable"
-    r = requests.get(url)
-    r.raise_for_status()
-
-    with open(VAR_CONTENT, "w", encoding="utf-8") as f:
-        f.write(r.text)
-
-    ids = re.findall(r"id='([A-Z]{3}[0-9]{3}[A-Z]?)'", r.text)
-    with open(CLEAN_COURS, "a", encoding="utf-8") as f:
-        for id_ in sorted(set(ids)):
-            f.write(id_ + "\n")
-
-    # final dedup / sort
-    ps_sort_unique = f"""
-        Get-Content '{CLEAN_COURS}' |
-        Sort-Object -Unique |
-        Set-Content '{CLEAN_COURS}'          #  ← no -NoNewline here
+async def crawl(resume=False):
     """
-    run_cmd(ps_command(ps_sort_unique))
-
-    print("Programme data scraping completed.\n")
-
-def scrape_cours():
-    print("\n=== Scraping course details ===")
-    run_cmd([PYTHON, SCRIPT_SCRAPE_COURS])
-
-    # ------------------------------------------------------------------ #
-    #  sort & uniq raw CSV   (sort | uniq)
-    # ------------------------------------------------------------------ #
-    if os.path.exists(CLEAN_DATA):
-        os.remove(CLEAN_DATA)
+    Crawl programmes and courses together: every sigle discovered on a
+    programme (or the contenu-variable page) goes straight to the course
+    scraper, so both crawls overlap.  Return the sorted sigles.
 
-    ps_csv_dedup = f"""
-        Get-Content '{RAW_DATA}' |
-        Sort-Object -Unique |
-        Set-Content '{CLEAN_DATA}'
+    With *resume*, sigles already recorded in the course scraper's journal
+    are not fetched again – only for finishing an interrupted refresh, as
+    their rows are as old as that refresh.
     """
-    run_cmd(ps_command(ps_csv_dedup))
-
-    # ------------------------------------------------------------------ #
-    #  rebuild database & JSON – unchanged
-    # ------------------------------------------------------------------ #
-    if os.path.exists(DB_FILE):
-        os.remove(DB_FILE)
-
-    run_cmd([PYTHON, SCRIPT_CSV_TO_SQL])
-    run_cmd([PYTHON, SCRIPT_SIGLES_TO_JSON])
-
-    print("Course details scraping completed.\n")
+    print("\n=== Scraping programmes and course details ===")
+    sigles = []
+
+    async def discovered():
+        async for sigle in scrape_programmes_uqam.discover_sigles():
+            sigles.append(sigle)
+            yield sigle
+
+    await scrape_cours_uqam.main(resume=resume, sigles=discovered())
+    print(scrape_programmes_uqam.THROTTLE.report())
+    return sorted(sigles)
+
+def publish_sigles(sigles):
+    """Write the course list and its JSON twin used by the autocomplete."""
+    CLEAN_COURS.write_text("".join(f"{s}\n" for s in sigles), encoding="utf-8")
+    text_to_json(CLEAN_COURS, COURS_JSON)
+    print(f"Published {len(sigles)} sigles to {COURS_JSON}")
+
+def read_scraped_rows():
+    """Return the distinct rows of the raw CSV, header excluded, sorted."""
+    with RAW_DATA.open(newline="", encoding="utf-8") as f:
+        reader = csv.reader(f)
+        next(reader, None)
+        return sorted(set(map(tuple, reader)))
+
+def rebuild_database(rows):
+    """
+    Build the database and the catalog snapshot beside the live files, then
+    rename them into place.  The running app keeps serving the previous
+    version until the rename and hot-reloads on the next request.
+    """
+    print("\n=== Rebuilding the database ===")
+    if not rows:
+        sys.exit("No course rows were scraped – keeping the current database.")
+    new_db = DB_FILE.with_name(DB_FILE.name + ".tmp")
+    if new_db.exists():
+        os.remove(new_db)                       # left over by a failed build
+    build_database(rows, new_db)
+
+    # The snapshot records the new database's build stamp: until the rename
+    # below the app keeps reading the old database, then it loads the snapshot
+    n_sections, n_meetings = build_snapshot(str(new_db), str(SNAPSHOT))
+    os.replace(new_db, DB_FILE)
+    print(f"Swapped in {DB_FILE}: {len(rows)} rows, "
+          f"{n_sections} sections / {n_meetings} meetings.\n")
 
 def run_app():
     print("\n=== Starting the application ===\n")
@@ -179,7 +139,7 @@ def run_app():
 
 def clean():
     print("Cleaning up raw data files…")
-    for f in (RAW_COURS, RAW_DATA, VAR_CONTENT):
+    for f in (RAW_DATA, RAW_JOURNAL):
         try:
             os.remove(f)
         except FileNotFoundError:
@@ -218,8 +178,14 @@ def update_last_update_date():
 #  main
 # --------------------------------------------------------------------------- #
 def main():
-    scrape_programmes()
-    scrape_cours()
+    cli = argparse.ArgumentParser(description="Refresh the course data and rebuild the database")
+    cli.add_argument("--resume", action="store_true",
+                     help="finish an interrupted refresh: keep the courses it already scraped")
+    args = cli.parse_args()
+
+    sigles = asyncio.run(crawl(resume=args.resume))
+    rebuild_database(read_scraped_rows())
+    publish_sigles(sigles)
     update_last_update_date()
     # run_app()
     clean()     
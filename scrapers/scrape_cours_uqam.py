@@ -8,11 +8,32 @@ scrapers/scrape_cours_uqam_async.py   –  parallel, asyncio + aiohttp
        static/data/liste_cours.txt
 2. Fetches the corresponding course page
        https://etudier.uqam.ca/cours?sigle=ABC1234
-   concurrently (aiohttp, configurable pool size).
-3. Parses the HTML, extracts every offered group (semester, day, hour …).
+   concurrently (aiohttp).  The number of requests in flight adapts to
+   how the server copes (see throttle.py), and timeouts / 429 / 5xx are
+   retried with backoff instead of silently yielding "no groups".  Pages are requested
+   conditionally (If-None-Match / If-Modified-Since) against an on-disk
+   page cache; a 304, or a 200 whose content hash did not change, reuses
+   the rows parsed on a previous run instead of parsing again – as long as
+   they were parsed with the current SEMESTERS and PARSER_VERSION.
+3. Hands the HTML through a bounded queue to a pool of parser processes,
+   which extract every offered group (semester, day, hour …).  Only the
+   groupes_wrapper* subtrees are turned into a tree.  When the parsers
+   fall behind, the full queue makes the fetchers wait (backpressure), so
+   parsing never runs on – and never stalls – the event loop.  At most
+   CONCURRENCY fetchers exist at once and each one keeps its place until
+   its page is queued, so waiting pages stop new downloads instead of
+   piling up in memory.
 4. Appends the result to
        static/data/raw_data_uqam.csv
    – ONE row per group, *no duplicates*.
+5. Records every finished sigle (ok / empty / failed) in a journal beside
+   the CSV, so an interrupted run can be resumed with only the sigles that
+   are missing or failed.  Every run starts over unless asked otherwise,
+   so a refresh never keeps the rows of an older one:
+
+       python scrapers/scrape_cours_uqam.py                 # start over
+       python scrapers/scrape_cours_uqam.py --resume        # finish a run
+       python scrapers/scrape_cours_uqam.py --retry-failed  # failed only
 
 This is a drop-in replacement for the previous synchronous scraper but
 faster and following the same “coding style” as the parallel
@@ -20,17 +41,24 @@ scrape_programmes_uqam.py we prepared earlier.
 """
 from __future__ import annotations
 
+import argparse
 import asyncio
+import concurrent.futures as cf
 import csv
+import hashlib
+import json
 import os
 import re
+import sqlite3
 import string
 import sys
 from pathlib import Path
-from typing import List
+from typing import AsyncIterable, Iterable, List
 
 import aiohttp
-from bs4 import BeautifulSoup                 # pip install beautifulsoup4
+from bs4 import BeautifulSoup, SoupStrainer   # pip install beautifulsoup4
+
+from throttle import RETRY_STATUSES, RetryableError, Throttle, retry_after
 try:
     from tqdm import tqdm                     # pip install tqdm  (optional)
 except ImportError:                           # stub if tqdm not available
@@ -42,39 +70,133 @@ except ImportError:                           # stub if tqdm not available
 # --------------------------------------------------------------------------- #
 SIGLES_FILE       = Path("static/data/liste_cours.txt")
 OUTPUT_CSV        = Path("static/data/raw_data_uqam.csv")
+JOURNAL_FILE      = Path("static/data/raw_data_uqam.journal")
+
+# ETag / Last-Modified / content hash + parsed rows of every page, by sigle.
+# Point UQAM_BASE_URL at a local stand-in server to test without UQAM.
+PAGE_CACHE_DB     = Path(os.getenv("UQAM_PAGE_CACHE", "static/data/page_cache.db"))
+BASE_URL          = os.getenv("UQAM_BASE_URL", "https://etudier.uqam.ca").rstrip("/")
 
 FLUSH_EVERY_ROWS  = 500           # write to disk every N parsed rows
-DEFAULT_WORKERS   = 256           # simultaneous HTTP requests
+DEFAULT_WORKERS   = 256           # most simultaneous HTTP requests
+INITIAL_WORKERS   = 16            # where the adaptive limit starts
 TIMEOUT_SECONDS   = 15
+MAX_RETRIES       = 5
 
-# Override concurrency with   UQAM_ASYNC_WORKERS=128  python …
+# Override the ceiling with   UQAM_ASYNC_WORKERS=128  python …
 CONCURRENCY       = int(os.getenv("UQAM_ASYNC_WORKERS", DEFAULT_WORKERS))
 
+# HTML parsing runs in a process pool fed by a bounded queue
+PARSE_WORKERS     = int(os.getenv("UQAM_PARSE_WORKERS", os.cpu_count() or 1))
+PARSE_QUEUE_SIZE  = PARSE_WORKERS * 4     # pages waiting for a parser
+
 SEMESTERS = [("groupes_wrapper20253", "automne2025"),
              ("groupes_wrapper20252", "ete2025"),
              ("groupes_wrapper20261", "hiver2026")]
 
+# Bump when parse() changes: cached rows from another parser are not reused
+PARSER_VERSION    = 1
+PARSER_SIGNATURE  = hashlib.sha1(
+    json.dumps([PARSER_VERSION, SEMESTERS]).encode("utf-8")).hexdigest()
+
 HEADERS  = {"User-Agent": "Mozilla/5.0 (compatible; uqam-async-scraper/2.0)"}
 
 ASCII    = string.ascii_uppercase
 RE_TIME  = re.compile(r"De (?P<debut>.*?)\s+à\s+(?P<fin>.*)")
 
+# only the per-semester group blocks are built into a tree
+GROUPS_ONLY = SoupStrainer(id=re.compile(r"^groupes_wrapper"))
+
 FIELDNAMES = ["Name", "Group Number", "Day", "Dates",
               "Start Time", "End Time", "Location", "Type", "Teacher"]
 
 # --------------------------------------------------------------------------- #
 #  Networking                                                                 #
 # --------------------------------------------------------------------------- #
-async def fetch(session: aiohttp.ClientSession, sigle: str) -> tuple[str, str]:
-    """Return (sigle, html) or (sigle, "") on error."""
-    url = f"https://etudier.uqam.ca/cours?sigle={sigle}"
+async def fetch(session: aiohttp.ClientSession, sigle: str,
+                cached: dict | None = None) -> tuple[str, str | None, dict]:
+    """Return (sigle, html, validators).
+
+    html is None when the server answers 304 Not Modified to the
+    validators of *cached*.  Transient failures raise RetryableError,
+    anything else (e.g. 404) raises aiohttp.ClientResponseError.
+    """
+    url = f"{BASE_URL}/cours?sigle={sigle}"
+    headers = {}
+    if cached:
+        if cached["etag"]:
+            headers["If-None-Match"] = cached["etag"]
+        if cached["last_modified"]:
+            headers["If-Modified-Since"] = cached["last_modified"]
     try:
-        async with session.get(url, timeout=TIMEOUT_SECONDS) as resp:
+        async with session.get(url, headers=headers, timeout=TIMEOUT_SECONDS) as resp:
+            if resp.status == 304 and cached:
+                return sigle, None, {}
+            if resp.status in RETRY_STATUSES:
+                raise RetryableError(f"HTTP {resp.status}",
+                                     retry_after(resp.headers.get("Retry-After")))
             resp.raise_for_status()
-            return sigle, await resp.text()
-    except Exception as exc:
-        print(f"[WARN] {sigle}: {exc}", file=sys.stderr)
-        return sigle, ""
+            validators = {"etag": resp.headers.get("ETag"),
+                          "last_modified": resp.headers.get("Last-Modified")}
+            return sigle, await resp.text(), validators
+    except (asyncio.TimeoutError, aiohttp.ClientConnectionError,
+            aiohttp.ClientPayloadError) as exc:
+        raise RetryableError(f"{type(exc).__name__}: {exc}") from exc
+
+
+# --------------------------------------------------------------------------- #
+#  Page cache                                                                 #
+# --------------------------------------------------------------------------- #
+class PageCache:
+    """Validators, content hash and parsed rows of each course page (SQLite).
+
+    Entries parsed under another PARSER_SIGNATURE are treated as missing, so
+    the page is fetched unconditionally and parsed again.
+    """
+
+    def __init__(self, path: Path, parser: str = PARSER_SIGNATURE):
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self.parser = parser
+        self.conn = sqlite3.connect(path)
+        columns = [c[1] for c in self.conn.execute("PRAGMA table_info(pages)")]
+        if columns and "parser" not in columns:     # cache from before parser signatures
+            self.conn.execute("DROP TABLE pages")
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS pages (
+                sigle         TEXT PRIMARY KEY,
+                etag          TEXT,
+                last_modified TEXT,
+                sha1          TEXT NOT NULL,
+                rows          TEXT NOT NULL,
+                parser        TEXT NOT NULL
+            )""")
+
+    def get(self, sigle: str) -> dict | None:
+        row = self.conn.execute(
+            "SELECT etag, last_modified, sha1, rows FROM pages "
+            "WHERE sigle = ? AND parser = ?", (sigle, self.parser)).fetchone()
+        if row is None:
+            return None
+        etag, last_modified, sha1, rows = row
+        return dict(etag=etag, last_modified=last_modified, sha1=sha1,
+                    rows=json.loads(rows))
+
+    def put(self, sigle: str, validators: dict, sha1: str, rows: list[dict]) -> None:
+        self.conn.execute(
+            "INSERT OR REPLACE INTO pages VALUES (?, ?, ?, ?, ?, ?)",
+            (sigle, validators.get("etag"), validators.get("last_modified"),
+             sha1, json.dumps(rows, ensure_ascii=False), self.parser))
+
+    def commit(self) -> None:
+        self.conn.commit()
+
+    def close(self) -> None:
+        self.conn.commit()
+        self.conn.close()
+
+
+def content_hash(html: str) -> str:
+    return hashlib.sha1(html.encode("utf-8")).hexdigest()
 
 
 # --------------------------------------------------------------------------- #
@@ -85,7 +207,7 @@ def parse(html: str, sigle: str) -> List[dict]:
     if not html:
         return []
 
-    soup = BeautifulSoup(html, "lxml")
+    soup = BeautifulSoup(html, "lxml", parse_only=GROUPS_ONLY)
     rows: list[dict] = []
 
     for div_id, semester in SEMESTERS:
@@ -134,12 +256,17 @@ def parse(html: str, sigle: str) -> List[dict]:
 # --------------------------------------------------------------------------- #
 #  CSV helpers                                                                #
 # --------------------------------------------------------------------------- #
-def open_writer(path: Path, resume: bool):
-    """Return (file_handle, csv_writer, already_existing_row_count)."""
+def open_writer(path: Path, resume: bool, size: int | None = None):
+    """Return (file_handle, csv_writer, already_existing_row_count).
+
+    When resuming, the file is cut back to *size* bytes, the end of the
+    last write recorded in the journal.
+    """
     path.parent.mkdir(parents=True, exist_ok=True)
 
-    if resume and path.exists():
+    if resume and size and path.exists():
         fh = path.open("r+", newline="", encoding="utf-8")
+        fh.truncate(size)
         existing = sum(1 for _ in fh) - 1          # minus header
         fh.seek(0, os.SEEK_END)
         writer = csv.DictWriter(fh, FIELDNAMES)
@@ -156,46 +283,210 @@ def flush_to_disk(fh):
     os.fsync(fh.fileno())
 
 
+class Journal:
+    """Append-only log of the sigles whose rows are safely in the CSV.
+
+    Lines are "<status>\t<sigle>" (ok, empty or failed; the last line for a
+    sigle wins), and every commit ends with "@<csv size>".  Entries are only
+    written after the CSV has been fsync'ed, so on resume anything past the
+    last recorded size belongs to unjournaled sigles and is cut off.
+    """
+
+    def __init__(self, path: Path):
+        self.path = path
+        self.pending: list[str] = []
+        self.fh = None
+
+    def load(self) -> tuple[dict[str, str], int | None]:
+        """Return ({sigle: status}, csv size at the last commit)."""
+        status: dict[str, str] = {}
+        size = None
+        if not self.path.exists():
+            return status, size
+        for line in self.path.read_text(encoding="utf-8").splitlines():
+            if line.startswith("@"):
+                size = int(line[1:])
+            elif "\t" in line:
+                state, sigle = line.split("\t", 1)
+                status[sigle] = state
+        return status, size
+
+    def open(self, fresh: bool) -> None:
+        self.fh = self.path.open("w" if fresh else "a", encoding="utf-8")
+
+    def record(self, sigle: str, status: str) -> None:
+        self.pending.append(f"{status}\t{sigle}\n")
+
+    def commit(self, csv_size: int) -> None:
+        self.fh.writelines(self.pending)
+        self.fh.write(f"@{csv_size}\n")
+        flush_to_disk(self.fh)
+        self.pending.clear()
+
+    def close(self) -> None:
+        self.fh.close()
+
+
 # --------------------------------------------------------------------------- #
 #  Main driver                                                                #
 # --------------------------------------------------------------------------- #
-async def main(resume: bool = True) -> None:
-    if not SIGLES_FILE.exists():
-        sys.exit(f"Sigle file not found: {SIGLES_FILE}")
-
-    sigles = [s.strip() for s in SIGLES_FILE.read_text().splitlines() if s.strip()]
-    total_sigles = len(sigles)
-    if total_sigles == 0:
-        sys.exit("Sigle file is empty – nothing to do.")
-
-    csv_file, writer, already_done = open_writer(OUTPUT_CSV, resume)
+async def _aiter(items: Iterable[str] | AsyncIterable[str]):
+    if isinstance(items, AsyncIterable):
+        async for item in items:
+            yield item
+    else:
+        for item in items:
+            yield item
+
+
+async def main(resume: bool = False, retry_failed: bool = False,
+               sigles: Iterable[str] | AsyncIterable[str] | None = None) -> dict:
+    """Scrape *sigles* (default: the ones listed in SIGLES_FILE) into OUTPUT_CSV.
+
+    *sigles* may be an async iterable: each sigle is fetched as soon as it
+    arrives, so discovery and scraping overlap.  Repeated sigles are
+    skipped.  With *resume* the sigles the journal has are kept as they
+    are; with *retry_failed* only the ones it marks as failed are fetched
+    again, which needs the journal of an earlier run.
+
+    Returns how many pages were not modified, unchanged, parsed or failed.
+    """
+    if sigles is None:
+        if not SIGLES_FILE.exists():
+            sys.exit(f"Sigle file not found: {SIGLES_FILE}")
+        sigles = [s.strip() for s in SIGLES_FILE.read_text().splitlines() if s.strip()]
+        if not sigles:
+            sys.exit("Sigle file is empty – nothing to do.")
+
+    journal = Journal(JOURNAL_FILE)
+    status, size = journal.load() if (resume or retry_failed) and OUTPUT_CSV.exists() else ({}, None)
+    if retry_failed and size is None:
+        # starting over would truncate the CSV the failed sigles belong to
+        sys.exit(f"No journal for {OUTPUT_CSV} – nothing to retry.")
+    resume = size is not None
+
+    def wanted(sigle: str) -> bool:
+        if retry_failed:
+            return status.get(sigle) == "failed"
+        return status.get(sigle, "failed") == "failed"
+
+    total_sigles = None                         # unknown while streaming
+    if not isinstance(sigles, AsyncIterable):
+        sigles = [s for s in dict.fromkeys(sigles) if wanted(s)]
+        total_sigles = len(sigles)
+
+    csv_file, writer, already_done = open_writer(OUTPUT_CSV, resume, size)
+    journal.open(fresh=not resume)
     processed_rows = already_done
-    if already_done:
+    if resume:
+        left = "" if total_sigles is None else f", {total_sigles} sigles left to fetch"
         print(f"[INFO] Resuming – {already_done} rows already present in "
-              f"{OUTPUT_CSV.name}")
+              f"{OUTPUT_CSV.name}{left}")
+
+    cache = PageCache(PAGE_CACHE_DB, PARSER_SIGNATURE)
+    stats = {"not modified": 0, "unchanged": 0, "parsed": 0, "failed": 0}
 
     connector = aiohttp.TCPConnector(limit=CONCURRENCY, ssl=False)
-    sem = asyncio.Semaphore(CONCURRENCY)
+    throttle = Throttle("course pages", initial=min(INITIAL_WORKERS, CONCURRENCY),
+                        maximum=CONCURRENCY, retries=MAX_RETRIES)
+    loop = asyncio.get_running_loop()
+    queue: asyncio.Queue = asyncio.Queue(maxsize=PARSE_QUEUE_SIZE)
+    results: asyncio.Queue = asyncio.Queue()    # (sigle, rows, page); None = end of input
 
     async with aiohttp.ClientSession(connector=connector, headers=HEADERS) as session:
 
-        async def worker(one_sigle: str):
-            async with sem:                             # bound concurrency
-                s, html = await fetch(session, one_sigle)
-                return parse(html, s)
+        # a fetcher holds one of these from creation until its page is queued
+        fetch_slots = asyncio.Semaphore(CONCURRENCY)
 
-        tasks = [asyncio.create_task(worker(s)) for s in sigles]
+        async def fetcher(one_sigle: str):
+            try:
+                await fetch_page(one_sigle)
+            finally:
+                fetch_slots.release()
+
+        async def fetch_page(one_sigle: str):
+            cached = cache.get(one_sigle)
+            try:
+                s, html, validators = await throttle.call_async(
+                    fetch, session, one_sigle, cached)
+            except Exception as exc:                    # retries exhausted, 404, …
+                print(f"[WARN] {one_sigle}: {exc}", file=sys.stderr)
+                stats["failed"] += 1
+                results.put_nowait((one_sigle, None, None))
+                return
+            if html is None:                            # 304 Not Modified
+                stats["not modified"] += 1
+                results.put_nowait((s, cached["rows"], None))
+            else:
+                digest = content_hash(html)
+                if cached and cached["sha1"] == digest:
+                    stats["unchanged"] += 1             # same page, new validators
+                    results.put_nowait((s, cached["rows"], (validators, digest)))
+                else:
+                    stats["parsed"] += 1
+                    # waits while parsers are behind
+                    await queue.put((s, html, (validators, digest)))
+
+        async def parser(pool: cf.ProcessPoolExecutor):
+            while True:
+                s, html, page = await queue.get()
+                try:
+                    rows = await loop.run_in_executor(pool, parse, html, s)
+                except Exception as exc:
+                    print(f"[ERROR] {s}: parsing failed: {exc}", file=sys.stderr)
+                    stats["failed"] += 1
+                    rows, page = None, None
+                results.put_nowait((s, rows, page))
+
+        pool = cf.ProcessPoolExecutor(max_workers=PARSE_WORKERS)
+        parsers = [asyncio.create_task(parser(pool)) for _ in range(PARSE_WORKERS)]
+        fetchers: list[asyncio.Task] = []
+
+        async def feed():
+            seen: set[str] = set()
+            try:
+                async for one_sigle in _aiter(sigles):
+                    if one_sigle not in seen and wanted(one_sigle):
+                        seen.add(one_sigle)
+                        await fetch_slots.acquire()     # waits while pages pile up
+                        fetchers.append(asyncio.create_task(fetcher(one_sigle)))
+            finally:
+                results.put_nowait(None)
+
+        feeder = asyncio.create_task(feed())
+
+        def outcomes():
+            """Yield one awaitable per result, until every fed sigle is handled."""
+            taken = 0
+
+            async def next_outcome():
+                nonlocal taken
+                # skip the end-of-input marker while results are still due
+                while (outcome := await results.get()) is None and taken < len(fetchers):
+                    pass
+                taken += outcome is not None
+                return outcome
+
+            while not (feeder.done() and taken == len(fetchers)):
+                yield next_outcome()
 
         buffer: list[dict] = []
-        for fut in tqdm(asyncio.as_completed(tasks),
+        for fut in tqdm(outcomes(),
                         total=total_sigles,
                         desc="Scraping courses",
                         ncols=80):
-            try:
-                rows = await fut
-            except Exception as exc:
-                print(f"[ERROR] task failed: {exc}", file=sys.stderr)
+            outcome = await fut
+            if outcome is None:                         # input ended, nothing due
                 continue
+            s, rows, page = outcome
+            if rows is None:
+                journal.record(s, "failed")
+                continue
+            journal.record(s, "ok" if rows else "empty")
+
+            if page:
+                validators, digest = page
+                cache.put(s, validators, digest, rows)
 
             buffer.extend(rows)
             processed_rows += len(rows)
@@ -203,21 +494,42 @@ async def main(resume: bool = True) -> None:
             if len(buffer) >= FLUSH_EVERY_ROWS:
                 writer.writerows(buffer)
                 flush_to_disk(csv_file)
+                journal.commit(os.fstat(csv_file.fileno()).st_size)
+                cache.commit()
                 buffer.clear()
 
         # final flush
-        if buffer:
-            writer.writerows(buffer)
-            flush_to_disk(csv_file)
+        writer.writerows(buffer)
+        flush_to_disk(csv_file)
+        journal.commit(os.fstat(csv_file.fileno()).st_size)
+
+        for task in parsers + fetchers:
+            task.cancel()
+        pool.shutdown()
+        feeder.result()                             # re-raise a failed discovery
 
+    cache.close()
+    journal.close()
     csv_file.close()
     print(f"\nWrote {processed_rows} rows to {OUTPUT_CSV.resolve()}")
+    print("Pages: " + ", ".join(f"{n} {what}" for what, n in stats.items()))
+    print(throttle.report())
+    if stats["failed"]:
+        print(f"{stats['failed']} sigles failed – rerun with --retry-failed")
+    return stats
 
 
 # --------------------------------------------------------------------------- #
 if __name__ == "__main__":
+    cli = argparse.ArgumentParser(description="Scrape UQAM course pages")
+    mode = cli.add_mutually_exclusive_group()
+    mode.add_argument("--resume", action="store_true",
+                      help="finish an interrupted run: skip the sigles the journal has")
+    mode.add_argument("--retry-failed", action="store_true",
+                      help="only fetch the sigles the journal marks as failed")
+    args = cli.parse_args()
     try:
-        asyncio.run(main())
+        asyncio.run(main(resume=args.resume, retry_failed=args.retry_failed))
     except KeyboardInterrupt:
         print("\nInterrupted by user", file=sys.stderr)
         sys.exit(130)
\ No newline at end of file
@@ -6,7 +6,8 @@ scrapers/scrape_programmes_uqam.py   – parallel edition
 
 1. Collects every “programme” URL listed on
        https://etudier.uqam.ca/programmes
-2. Downloads those pages in parallel (thread pool).
+2. Downloads those pages in parallel (thread pool); how many at once adapts
+   to the server, and transient errors are retried (see throttle.py).
 3. Extracts every course sigle ABC1234 it can find.
 4. Writes exactly ONE line per sigle to
        static/data/raw_liste_cours.txt
@@ -15,20 +16,28 @@ scrapers/scrape_programmes_uqam.py   – parallel edition
 
 The format is the one expected by the rest of your pipeline – no more
 Python lists on the right-hand side.
+
+discover_sigles() is the asyncio flavour used by make.py: it yields each
+new sigle (contenu-variable ids included) as soon as the page listing it
+arrives, so course pages can be fetched while programmes are still being
+crawled.
 """
 from __future__ import annotations
 
+import asyncio
 import concurrent.futures as cf
 import os
 import re
 import sys
-import time
 from pathlib import Path
-from typing import Iterable, Set, Tuple
+from typing import AsyncIterator, Iterable, Iterator, Set, Tuple
 from urllib.parse import urljoin
 
+import aiohttp
 import requests
 from bs4 import BeautifulSoup                # pip install beautifulsoup4
+
+from throttle import RETRY_STATUSES, RetryableError, Throttle, retry_after
 try:
     from tqdm import tqdm                    # pip install tqdm (optional)
 except ImportError:                          # tiny stub if tqdm is absent
@@ -41,39 +50,67 @@ except ImportError:                          # tiny stub if tqdm is absent
 BASE_DIR       = Path("static", "data")
 RAW_COURS_FILE = BASE_DIR / "raw_liste_cours.txt"
 
-ROOT_URL   = "https://etudier.uqam.ca"
+ROOT_URL   = os.getenv("UQAM_BASE_URL", "https://etudier.uqam.ca").rstrip("/")
 INDEX_URL  = urljoin(ROOT_URL, "/programmes")
+VAR_CONTENT_URL = urljoin(ROOT_URL, "/cours-contenu-variable")
 
 HEADERS    = {"User-Agent": "Mozilla/5.0 (compatible; uqam-scraper/2.0)"}
 TIMEOUT    = 30                    # seconds
 COURSE_RE  = re.compile(r"[A-Z]{3}[0-9]{4}")
+VAR_CONTENT_RE = re.compile(r"id='([A-Z]{3}[0-9]{3}[A-Z]?)'")
 
 # parallelism --------------------------------------------------------------- #
-MAX_WORKERS = int(os.getenv("UQAM_SCRAPER_WORKERS", "8"))   # tweak as desired
-SLEEP_BETWEEN = 0.1     # seconds – stay polite, even when in parallel
+MAX_WORKERS = int(os.getenv("UQAM_SCRAPER_WORKERS", "32"))  # ceiling, tweak as desired
+INITIAL_WORKERS = 8     # where the adaptive limit starts
+# requests per second – stay polite, even when in parallel
+MAX_RATE = float(os.getenv("UQAM_SCRAPER_RATE", "10"))
 # --------------------------------------------------------------------------- #
 
-# requests session shared by all threads
+# requests session and throttle shared by all threads
 SESSION = requests.Session()
 SESSION.headers.update(HEADERS)
+SESSION.mount("https://", requests.adapters.HTTPAdapter(pool_maxsize=MAX_WORKERS))
+SESSION.mount("http://", requests.adapters.HTTPAdapter(pool_maxsize=MAX_WORKERS))
+THROTTLE = Throttle("programme pages", initial=min(INITIAL_WORKERS, MAX_WORKERS),
+                    maximum=MAX_WORKERS, rate=MAX_RATE)
 
 
 # --------------------------------------------------------------------------- #
 #  Helper functions                                                           #
 # --------------------------------------------------------------------------- #
-def get_html(url: str) -> str:
-    """Download *url* and return its HTML text, raising for HTTP errors."""
-    rsp = SESSION.get(url, timeout=TIMEOUT)
+def _get_html_once(url: str) -> str:
+    try:
+        rsp = SESSION.get(url, timeout=TIMEOUT)
+    except (requests.Timeout, requests.ConnectionError) as exc:
+        raise RetryableError(f"{type(exc).__name__}: {exc}") from exc
+    if rsp.status_code in RETRY_STATUSES:
+        raise RetryableError(f"HTTP {rsp.status_code}",
+                             retry_after(rsp.headers.get("Retry-After")))
     rsp.raise_for_status()
     return rsp.text
 
 
+def get_html(url: str) -> str:
+    """Download *url* and return its HTML text, raising for HTTP errors.
+
+    Transient errors are retried with backoff; the number of downloads in
+    flight across all threads is bounded by the shared THROTTLE.
+    """
+    return THROTTLE.call(_get_html_once, url)
+
+
 def find_programme_urls() -> Set[str]:
     """
     Scrape the main “all programmes” page and return the set
     of absolute URLs to individual programme pages.
     """
-    html = get_html(INDEX_URL)
+    urls = programme_urls(get_html(INDEX_URL))
+    print(f"Found {len(urls)} programme URLs on {INDEX_URL}")
+    return urls
+
+
+def programme_urls(html: str) -> Set[str]:
+    """Return the absolute programme URLs linked from the index page *html*."""
     soup = BeautifulSoup(html, "html.parser")
     urls: set[str] = set()
 
@@ -82,8 +119,6 @@ def find_programme_urls() -> Set[str]:
         if not href:
             continue
         urls.add(urljoin(ROOT_URL, href))
-
-    print(f"Found {len(urls)} programme URLs on {INDEX_URL}")
     return urls
 
 
@@ -109,6 +144,69 @@ def scrape_single_programme(url: str) -> Tuple[str, Set[str]] | None:
     return (url, sigles)
 
 
+def iter_programmes(programme_urls: Iterable[str]) -> Iterator[Tuple[str, Set[str]]]:
+    """Yield (url, sigle_set) for every programme page, as downloads finish."""
+    with cf.ThreadPoolExecutor(max_workers=MAX_WORKERS) as exe:
+        futures = [exe.submit(scrape_single_programme, url)
+                   for url in programme_urls]
+
+        for fut in tqdm(cf.as_completed(futures),
+                        total=len(futures),
+                        desc="Scraping programmes",
+                        ncols=80):
+            res = fut.result()
+            if res:
+                yield res
+
+
+# --------------------------------------------------------------------------- #
+#  asyncio crawl                                                              #
+# --------------------------------------------------------------------------- #
+async def _get_html_async(session: aiohttp.ClientSession, url: str) -> str:
+    try:
+        async with session.get(url, timeout=TIMEOUT) as resp:
+            if resp.status in RETRY_STATUSES:
+                raise RetryableError(f"HTTP {resp.status}",
+                                     retry_after(resp.headers.get("Retry-After")))
+            resp.raise_for_status()
+            return await resp.text()
+    except (asyncio.TimeoutError, aiohttp.ClientConnectionError,
+            aiohttp.ClientPayloadError) as exc:
+        raise RetryableError(f"{type(exc).__name__}: {exc}") from exc
+
+
+async def _page_sigles(session: aiohttp.ClientSession, url: str,
+                       pattern: re.Pattern = COURSE_RE) -> Set[str]:
+    """Return the sigles *pattern* finds on *url*; an empty set on failure (logged)."""
+    try:
+        html = await THROTTLE.call_async(_get_html_async, session, url)
+    except Exception as exc:
+        print(f"[WARN] {url} … {exc}", file=sys.stderr)
+        return set()
+    return set(pattern.findall(html))
+
+
+async def discover_sigles() -> AsyncIterator[str]:
+    """Yield every distinct sigle of every programme and of the contenu-variable page."""
+    async with aiohttp.ClientSession(headers=HEADERS) as session:
+        index = await THROTTLE.call_async(_get_html_async, session, INDEX_URL)
+        urls = programme_urls(index)
+        print(f"Found {len(urls)} programme URLs on {INDEX_URL}")
+
+        pages = [asyncio.create_task(_page_sigles(session, url)) for url in urls]
+        pages.append(asyncio.create_task(
+            _page_sigles(session, VAR_CONTENT_URL, VAR_CONTENT_RE)))
+        seen: set[str] = set()
+        try:
+            for page in asyncio.as_completed(pages):
+                for sigle in sorted(await page - seen):
+                    seen.add(sigle)
+                    yield sigle
+        finally:
+            for page in pages:
+                page.cancel()
+
+
 # --------------------------------------------------------------------------- #
 #  Main logic                                                                 #
 # --------------------------------------------------------------------------- #
@@ -121,25 +219,13 @@ def main() -> None:
 
     written = 0
     with RAW_COURS_FILE.open("w", encoding="utf-8") as fh:
-        with cf.ThreadPoolExecutor(max_workers=MAX_WORKERS) as exe:
-            futures = [exe.submit(scrape_single_programme, url)
-                       for url in programme_urls]
-
-            for fut in tqdm(cf.as_completed(futures),
-                            total=len(futures),
-                            desc="Scraping programmes",
-                            ncols=80):
-                res = fut.result()
-                if not res:
-                    continue
-                url, sigles = res
-                for sigle in sorted(sigles):
-                    fh.write(f"{url}  =>  {sigle}\n")
-                    written += 1
-                # even though we are parallel, throttle a tiny bit
-                time.sleep(SLEEP_BETWEEN)
+        for url, sigles in iter_programmes(programme_urls):
+            for sigle in sorted(sigles):
+                fh.write(f"{url}  =>  {sigle}\n")
+                written += 1
 
     print(f"\nWrote {written} lines to {RAW_COURS_FILE}")
+    print(THROTTLE.report())
 
 
 # --------------------------------------------------------------------------- #
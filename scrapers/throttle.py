@@ -0,0 +1,227 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+scrapers/throttle.py   –  adaptive concurrency + retry, shared by the scrapers
+------------------------------------------------------------------------------
+
+A Throttle sits in front of every HTTP request of a scraper:
+
+1. Concurrency follows AIMD (additive increase, multiplicative decrease),
+   like TCP congestion control: the limit grows by one for every window of
+   successful requests, as long as latency stays close to its long-run
+   average, and is halved (at most once per round trip) when requests fail.
+2. Transient failures – timeouts, dropped connections, 429 and 5xx – are
+   raised as RetryableError by the scraper and retried with jittered
+   exponential backoff (honouring Retry-After).  The slot is released
+   while waiting, so a struggling server sees fewer requests, not the
+   same number later.
+3. An optional rate (requests started per second) spaces requests out
+   evenly, whatever the concurrency – politeness without sleeping in the
+   code that consumes the results.
+4. report() summarises throughput, retries, failures and how the limit
+   moved, for the end of a run.
+
+The same object works with threads (call) and with asyncio (call_async):
+
+    throttle = Throttle("courses", initial=16, maximum=256, rate=50)
+    html = await throttle.call_async(fetch_once, session, url)
+"""
+from __future__ import annotations
+
+import asyncio
+import random
+import threading
+import time
+from collections import Counter
+from email.utils import parsedate_to_datetime
+
+# HTTP statuses worth retrying: the server is busy or briefly unavailable
+RETRY_STATUSES = {408, 425, 429, 500, 502, 503, 504}
+
+LATENCY_TOLERANCE = 2.0      # stop growing once latency doubles its baseline
+LATENCY_SMOOTHING = 0.2      # weight of the newest sample: recent latency
+BASELINE_SMOOTHING = 0.02    # weight of the newest sample: long-run baseline
+
+
+class RetryableError(Exception):
+    """A transient failure; *retry_after* (seconds) comes from the server."""
+
+    def __init__(self, message: str, retry_after: float | None = None):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+def retry_after(value: str | None) -> float | None:
+    """Parse a Retry-After header (seconds or HTTP date) into seconds."""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+class Throttle:
+    """AIMD concurrency limit with jittered exponential retry and an optional rate limit."""
+
+    def __init__(self, name: str, initial: int = 8, minimum: int = 1,
+                 maximum: int = 64, retries: int = 5,
+                 base_delay: float = 0.5, max_delay: float = 30.0,
+                 rate: float | None = None):
+        self.name = name
+        self.initial = initial
+        self.minimum = minimum
+        self.maximum = max(maximum, minimum)
+        self.limit = float(min(max(initial, minimum), self.maximum))
+        self.retries = retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.rate = rate
+
+        self.inflight = 0
+        self.latency: float | None = None       # moving averages, seconds
+        self.baseline: float | None = None
+        self.low = self.peak = int(self.limit)
+        self.stats: Counter = Counter()
+        self.started = time.monotonic()
+        self._last_cut = 0.0
+        self._next_start = 0.0
+        self._cond = threading.Condition()
+        self._async_cond: asyncio.Condition | None = None
+
+    # ------------------------------------------------------------------ #
+    #  AIMD bookkeeping (callers hold self._cond)                         #
+    # ------------------------------------------------------------------ #
+    def _can_start(self) -> bool:
+        return self.inflight < int(self.limit)
+
+    def _pace(self) -> float:
+        """Book the next start allowed by the rate; return how long to wait for it."""
+        if not self.rate:
+            return 0.0
+        now = time.monotonic()
+        start = max(now, self._next_start)
+        self._next_start = start + 1 / self.rate
+        return start - now
+
+    def _on_success(self, latency: float) -> None:
+        self.stats["ok"] += 1
+        if self.latency is None:
+            self.latency = self.baseline = latency
+        else:
+            self.latency += LATENCY_SMOOTHING * (latency - self.latency)
+            self.baseline += BASELINE_SMOOTHING * (latency - self.baseline)
+        if self.latency <= LATENCY_TOLERANCE * self.baseline:
+            # +1 once every `limit` successes, i.e. once per window
+            self.limit = min(self.maximum, self.limit + 1 / self.limit)
+            self.peak = max(self.peak, int(self.limit))
+
+    def _on_failure(self) -> None:
+        now = time.monotonic()
+        # the other requests of the same window failed for the same reason:
+        # cut once per round trip, not once per failed request
+        if now - self._last_cut >= (self.latency or 1.0):
+            self.limit = max(self.minimum, self.limit / 2)
+            self.low = min(self.low, int(self.limit))
+            self._last_cut = now
+
+    def _finish(self, started: float, outcome: str) -> None:
+        self.inflight -= 1
+        if outcome == "ok":
+            self._on_success(time.monotonic() - started)
+        elif outcome == "retry":
+            self._on_failure()
+        elif outcome == "error":              # not a congestion signal
+            self.stats["failed"] += 1
+
+    def _delay(self, attempt: int, error: RetryableError) -> float:
+        """Full-jitter exponential backoff, at least the server's Retry-After."""
+        delay = random.uniform(0, min(self.max_delay, self.base_delay * 2 ** attempt))
+        return max(delay, min(error.retry_after or 0.0, self.max_delay))
+
+    def _give_up(self, error: RetryableError):
+        self.stats["failed"] += 1
+        raise error
+
+    # ------------------------------------------------------------------ #
+    #  Threads                                                            #
+    # ------------------------------------------------------------------ #
+    def call(self, fn, *args, **kwargs):
+        """Run fn(*args, **kwargs) within the limit, retrying RetryableError."""
+        for attempt in range(self.retries + 1):
+            with self._cond:
+                while not self._can_start():
+                    self._cond.wait()
+                self.inflight += 1
+                self.stats["requests"] += 1
+                wait = self._pace()
+            started, outcome = time.monotonic(), "cancelled"
+            try:
+                if wait:
+                    time.sleep(wait)
+                    started = time.monotonic()
+                result = fn(*args, **kwargs)
+                outcome = "ok"
+                return result
+            except RetryableError as exc:
+                error, outcome = exc, "retry"
+            except Exception:
+                outcome = "error"
+                raise
+            finally:
+                with self._cond:
+                    self._finish(started, outcome)
+                    self._cond.notify_all()
+            if attempt == self.retries:
+                self._give_up(error)
+            self.stats["retries"] += 1
+            time.sleep(self._delay(attempt, error))
+
+    # ------------------------------------------------------------------ #
+    #  asyncio                                                            #
+    # ------------------------------------------------------------------ #
+    async def call_async(self, fn, *args, **kwargs):
+        """Await fn(*args, **kwargs) within the limit, retrying RetryableError."""
+        if self._async_cond is None:
+            self._async_cond = asyncio.Condition()
+        cond = self._async_cond
+        for attempt in range(self.retries + 1):
+            async with cond:
+                await cond.wait_for(self._can_start)
+                self.inflight += 1
+                self.stats["requests"] += 1
+                wait = self._pace()
+            started, outcome = time.monotonic(), "cancelled"
+            try:
+                if wait:
+                    await asyncio.sleep(wait)
+                    started = time.monotonic()
+                result = await fn(*args, **kwargs)
+                outcome = "ok"
+                return result
+            except RetryableError as exc:
+                error, outcome = exc, "retry"
+            except Exception:
+                outcome = "error"
+                raise
+            finally:
+                async with cond:
+                    self._finish(started, outcome)
+                    cond.notify_all()
+            if attempt == self.retries:
+                self._give_up(error)
+            self.stats["retries"] += 1
+            await asyncio.sleep(self._delay(attempt, error))
+
+    # ------------------------------------------------------------------ #
+    def report(self) -> str:
+        elapsed = max(time.monotonic() - self.started, 1e-9)
+        ok, failed = self.stats["ok"], self.stats["failed"]
+        return (f"{self.name}: {ok} ok, {failed} failed, "
+                f"{self.stats['retries']} retries in {elapsed:.1f}s "
+                f"({ok / elapsed:.1f} req/s); concurrency {self.initial} → "
+                f"{int(self.limit)} (range {self.low}–{self.peak})")
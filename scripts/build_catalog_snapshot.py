@@ -0,0 +1,161 @@
+"""
+Write static/data/catalog.bin, a compact read-only snapshot of the sections
+in static/data/database.db that the app memory-maps at startup.
+
+All values are little-endian 4-byte integers so every array can be used in
+place (memoryview.cast) and shared between worker processes:
+
+    header          8s magic, then n_strings, n_string_bytes, n_sections,
+                    n_meetings, conflict_bytes (uint32), then the 16-byte
+                    build stamp of the database it was built from
+    str_offsets     uint32[n_strings + 1]   string i = bytes[off[i]:off[i+1]]
+    str_bytes       utf-8, padded to a multiple of 4
+    sec_name        uint32[n_sections]      string ids
+    sec_sigle       uint32[n_sections]
+    sec_season      uint32[n_sections]
+    sec_meetings    uint32[n_sections + 1]  meetings of section i: [m[i], m[i+1])
+    meet_day        uint32[n_meetings]      string id of the day name
+    meet_start      int32[n_meetings]       minutes since midnight, -1 if unknown
+    meet_end        int32[n_meetings]
+    sec_conflicts   conflict_bytes per section: little-endian bitset of the
+                    sections of the same season it overlaps, bit i being
+                    the season's i-th section
+
+Sections are sorted by (season, sigle, name), so each season and each sigle
+is a contiguous range of section ids. The app only uses the snapshot while
+the database's build_info stamp matches the one in the header.
+"""
+import os
+import sqlite3
+import struct
+import sys
+from array import array
+
+db_file_path = './static/data/database.db'
+snapshot_file_path = './static/data/catalog.bin'
+
+MAGIC = b'UQCAT003'
+HEADER = struct.Struct('<8s5I16s')
+VALID_DAYS = {'Lundi', 'Mardi', 'Mercredi', 'Jeudi', 'Vendredi', 'Samedi', 'Dimanche'}
+
+
+def read_build_stamp(connection):
+    """The stamp convert_csv_to_sql.py wrote into the database (zeros if it has none)."""
+    try:
+        row = connection.execute("SELECT stamp FROM build_info").fetchone()
+    except sqlite3.OperationalError:
+        row = None
+    return bytes.fromhex(row[0]) if row else bytes(16)
+
+
+def read_sections(db_path):
+    """Return [(season, sigle, name, [(day, start, end), ...])] sorted by season, sigle, name."""
+    connection = sqlite3.connect(db_path)
+    rows = connection.execute("""
+        SELECT Season, Sigle, Name, Day, Start_Minute, End_Minute
+        FROM tasks_table
+        WHERE Season IS NOT NULL
+        ORDER BY Season, Sigle, Name
+    """).fetchall()
+    stamp = read_build_stamp(connection)
+    connection.close()
+
+    sections = []
+    for season, sigle, name, day, start, end in rows:
+        if not sections or sections[-1][2] != name:
+            sections.append((season, sigle, name, []))
+        sections[-1][3].append((day, -1 if start is None else start, -1 if end is None else end))
+    return sections, stamp
+
+
+def conflict_bitsets(sections, width):
+    """Per section, the bitset (*width* bytes) of the same-season sections it overlaps.
+
+    Same sweep as the app's build_conflict_graph: meetings day by day in start order.
+    """
+    bitsets = [bytearray(width) for _ in sections]
+    first = 0
+    while first < len(sections):
+        season = sections[first][0]
+        last = first
+        while last < len(sections) and sections[last][0] == season:
+            last += 1
+        meetings_by_day = {}
+        for index in range(last - first):
+            for day, start, end in sections[first + index][3]:
+                if day in VALID_DAYS and 0 <= start < end:
+                    meetings_by_day.setdefault(day, []).append((start, end, index))
+        for meetings in meetings_by_day.values():
+            meetings.sort()
+            active = []
+            for start, end, index in meetings:
+                active = [meeting for meeting in active if meeting[0] > start]
+                for _, other in active:
+                    if other != index:
+                        bitsets[first + index][other >> 3] |= 1 << (other & 7)
+                        bitsets[first + other][index >> 3] |= 1 << (index & 7)
+                active.append((end, index))
+        first = last
+    return bitsets
+
+
+def build_snapshot(db_path, snapshot_path):
+    sections, stamp = read_sections(db_path)
+
+    strings = {}
+
+    def string_id(value):
+        return strings.setdefault(value, len(strings))
+
+    sec_name, sec_sigle, sec_season = array('I'), array('I'), array('I')
+    sec_meetings = array('I', [0])
+    meet_day, meet_start, meet_end = array('I'), array('i'), array('i')
+
+    for season, sigle, name, meetings in sections:
+        sec_name.append(string_id(name))
+        sec_sigle.append(string_id(sigle))
+        sec_season.append(string_id(season))
+        for day, start, end in meetings:
+            meet_day.append(string_id(day or ''))
+            meet_start.append(start)
+            meet_end.append(end)
+        sec_meetings.append(len(meet_day))
+
+    str_offsets = array('I', [0])
+    str_bytes = bytearray()
+    for value in strings:  # dicts keep insertion order, i.e. string id order
+        str_bytes += value.encode('utf-8')
+        str_offsets.append(len(str_bytes))
+    n_string_bytes = len(str_bytes)
+    str_bytes += b'\0' * (-len(str_bytes) % 4)
+
+    arrays = [str_offsets, sec_name, sec_sigle, sec_season, sec_meetings, meet_day, meet_start, meet_end]
+
+    # Wide enough for the largest season, rounded up to keep the file 4-byte aligned
+    season_sizes = {}
+    for season, *_ in sections:
+        season_sizes[season] = season_sizes.get(season, 0) + 1
+    conflict_bytes = -(-max(season_sizes.values(), default=0) // 32) * 4
+    conflicts = conflict_bitsets(sections, conflict_bytes)
+    if sys.byteorder != 'little':
+        for values in arrays:
+            values.byteswap()
+
+    # Write beside the live file and rename, so the app never maps a partial snapshot
+    tmp_path = snapshot_path + '.tmp'
+    with open(tmp_path, 'wb') as f:
+        f.write(HEADER.pack(MAGIC, len(strings), n_string_bytes, len(sections), len(meet_day),
+                            conflict_bytes, stamp))
+        str_offsets.tofile(f)
+        f.write(str_bytes)
+        for values in arrays[1:]:
+            values.tofile(f)
+        for bitset in conflicts:
+            f.write(bitset)
+    os.replace(tmp_path, snapshot_path)
+    return len(sections), len(meet_day)
+
+
+if __name__ == '__main__':
+    n_sections, n_meetings = build_snapshot(db_file_path, snapshot_file_path)
+    print(f"Wrote {n_sections} sections / {n_meetings} meetings to {snapshot_file_path}")
@@ -1,26 +1,117 @@
-import pandas as pd
+import csv
+import os
+import re
 import sqlite3
+import time
+import uuid
 
 # File paths
 csv_file_path = './static/data/data_uqam.csv'
 db_file_path = './static/data/database.db'
 
-# Define table schema (if needed, use sqlite3 for creating tables explicitly)
-columns = ['Name', 'Group_Number', 'Day', 'Dates', 'Start_Time', 'End_Time', 'Location', 'Type', 'Teacher']
-
-# Open SQLite connection
-connection = sqlite3.connect(db_file_path)
-
-# Process CSV in chunks
-chunksize = 1000
-for chunk in pd.read_csv(
-    csv_file_path,
-    sep=',',  # Adjust delimiter if needed
-    header=None,  # CSV has no header
-    names=columns,
-    chunksize=chunksize,
-):
-    chunk.to_sql('tasks_table', connection, if_exists='append', index=False)
-
-# Close connection
-connection.close()
+# Explicit schema: the raw columns plus values derived once here so the app
+# never has to parse names or times again
+schema = """
+    CREATE TABLE IF NOT EXISTS tasks_table (
+        Name TEXT NOT NULL,
+        Group_Number INTEGER,
+        Day TEXT,
+        Dates TEXT,
+        Start_Time TEXT,
+        End_Time TEXT,
+        Location TEXT,
+        Type TEXT,
+        Teacher TEXT,
+        Sigle TEXT,
+        Season TEXT,
+        Group_Letter TEXT,
+        Day_Index INTEGER,
+        Start_Minute INTEGER,
+        End_Minute INTEGER
+    )
+"""
+insert = f"INSERT INTO tasks_table VALUES ({', '.join('?' * 15)})"
+# A fresh random stamp per build: the catalog snapshot records the stamp of the
+# database it was built from, so the app can tell whether the two match
+build_info = [
+    "CREATE TABLE IF NOT EXISTS build_info (stamp TEXT NOT NULL)",
+    "DELETE FROM build_info",
+]
+indexes = [
+    "CREATE INDEX IF NOT EXISTS idx_tasks_season_sigle ON tasks_table (Season, Sigle)",
+    "CREATE INDEX IF NOT EXISTS idx_tasks_name ON tasks_table (Name)",
+]
+
+# Safe only because the file is built from scratch and renamed into place
+# afterwards: a crash leaves a broken temporary file, never a broken database
+bulk_load_pragmas = [
+    "PRAGMA journal_mode = OFF",
+    "PRAGMA synchronous = OFF",
+    "PRAGMA temp_store = MEMORY",
+    "PRAGMA cache_size = -65536",  # 64 MiB, for the index builds
+]
+
+DAYS = ['Lundi', 'Mardi', 'Mercredi', 'Jeudi', 'Vendredi', 'Samedi', 'Dimanche']
+DAY_INDEX = {day: i for i, day in enumerate(DAYS)}
+TIME_RE = re.compile(r'^\s*(\d{1,2})h(\d{2})\s*$')
+
+
+def to_minutes(value):
+    """Convert '14h30' to minutes since midnight (missing/invalid -> NULL)."""
+    m = TIME_RE.match(value) if value else None
+    return int(m[1]) * 60 + int(m[2]) if m else None
+
+
+def to_record(row):
+    """Return the table row for one scraped CSV row, or None for a stray header."""
+    # Empty fields become NULL; short rows are padded
+    row = [value or None for value in row[:9]] + [None] * (9 - len(row))
+    name, _group, day, _dates, start, end = row[:6]
+    # The raw CSV header can end up sorted in the middle of the file
+    if name is None or name == 'Name':
+        return None
+    # Names look like ACM1100-automne2025-A
+    sigle, season, letter = (name.split('-', 2) + [None, None])[:3]
+    return row + [sigle, season.lower() if season else None, letter,
+                  DAY_INDEX.get(day), to_minutes(start), to_minutes(end)]
+
+
+def build_database(rows, db_path):
+    """Load scraped rows (the 9 raw columns, as strings) into a new database at *db_path*.
+
+    Returns the number of rows loaded.
+    """
+    started = time.perf_counter()
+    connection = sqlite3.connect(db_path, isolation_level=None)
+    for pragma in bulk_load_pragmas:
+        connection.execute(pragma)
+    connection.execute(schema)
+
+    # One transaction for the whole load; indexes are cheaper to build once the data is in
+    connection.execute("BEGIN")
+    n_rows = connection.executemany(insert, filter(None, map(to_record, rows))).rowcount
+    for statement in indexes + build_info:
+        connection.execute(statement)
+    connection.execute("INSERT INTO build_info VALUES (?)", (uuid.uuid4().hex,))
+    connection.execute("COMMIT")
+    connection.close()
+
+    elapsed = time.perf_counter() - started
+    print(f"Loaded {n_rows} rows into {db_path} in {elapsed:.2f}s "
+          f"({n_rows / max(elapsed, 1e-9):,.0f} rows/s)")
+    return n_rows
+
+
+def convert(csv_path=csv_file_path, db_path=db_file_path):
+    """Rebuild *db_path* from *csv_path*; the old file is replaced only once the new one is complete."""
+    tmp_path = str(db_path) + '.tmp'
+    if os.path.exists(tmp_path):
+        os.remove(tmp_path)
+    with open(csv_path, newline='', encoding='utf-8') as f:
+        n_rows = build_database(csv.reader(f), tmp_path)
+    os.replace(tmp_path, db_path)
+    return n_rows
+
+
+if __name__ == '__main__':
+    convert()
@@ -16,5 +16,6 @@ def text_to_json(input_file, output_file):
 input_file = './static/data/liste_cours.txt'
 output_file = './static/data/cours_uqam.json'
 
-# Convert text to JSON
-text_to_json(input_file, output_file)
+if __name__ == '__main__':
+    # Convert text to JSON
+    text_to_json(input_file, output_file)
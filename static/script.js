@@ -1,4 +1,5 @@
 let classNames = [];
+const SCHEDULE_PAGE_SIZE = 25;
 $(document).ready(function() {
     $.getJSON('/static/data/cours_uqam.json', function(data) {
         classNames = data;
@@ -53,16 +54,17 @@ document.addEventListener('DOMContentLoaded', function() {
         blurMask.classList.add('active');
         displayClassList(sigles);
         try {
-            const response = await fetch('/schedule', {
-                method: 'POST',
-                body: formData
-            });
-            const data = await response.json();
+            const data = await fetchSchedulePage(formData, 0);
             if (data && data.schedules) {
+                window.scheduleFormData = formData;
                 window.schedules = data.schedules;
+                window.nextCursor = data.next_cursor;
                 window.currentScheduleIndex = 0;
                 updateScheduleDisplay();
                 await fetchAndDisplaySchedule(window.currentScheduleIndex);
+            } else if (data && data.error) {
+                alert(data.error);
+                clearCalendar();
             } else {
                 //console.error('No schedules returned:', data);
             }
@@ -91,6 +93,16 @@ document.addEventListener('DOMContentLoaded', function() {
     });
     document.getElementById('nextSchedule').addEventListener('click', async function() {
         blurMask.classList.add('active');
+        if (window.currentScheduleIndex === window.schedules.length - 1 && window.nextCursor != null) {
+            // Next page is only computed once the user pages past the loaded schedules
+            try {
+                const data = await fetchSchedulePage(window.scheduleFormData, window.nextCursor);
+                window.schedules = window.schedules.concat(data.schedules);
+                window.nextCursor = data.next_cursor;
+            } catch (error) {
+                window.nextCursor = null;
+            }
+        }
         if (window.currentScheduleIndex < window.schedules.length - 1) {
             window.currentScheduleIndex++;
             updateScheduleDisplay();
@@ -128,6 +140,7 @@ document.addEventListener('DOMContentLoaded', function() {
             calendarTableBody.appendChild(row);
         }
         window.schedules = [];
+        window.nextCursor = null;
         window.currentScheduleIndex = 0;
         document.getElementById("scheduleIndex").innerHTML = "1/1";
     }
@@ -155,17 +168,20 @@ document.addEventListener('DOMContentLoaded', function() {
                     blurMask.classList.remove('active');
                     return;
                 }
-                fetch('/schedule', {
-                    method: 'POST',
-                    body: formData
-                }).then(response => response.json()).then(data => {
+                fetchSchedulePage(formData, 0).then(data => {
                     if (data && data.schedules) {
+                        window.scheduleFormData = formData;
                         window.schedules = data.schedules;
+                        window.nextCursor = data.next_cursor;
                         window.currentScheduleIndex = 0;
                         updateScheduleDisplay();
                         fetchAndDisplaySchedule(window.currentScheduleIndex).finally(() => {
                             blurMask.classList.remove('active');
                         });
+                    } else if (data && data.error) {
+                        blurMask.classList.remove('active');
+                        alert(data.error);
+                        clearCalendar();
                     } else {
                         blurMask.classList.remove('active');
                         //console.error('No schedules returned:', data);
@@ -183,18 +199,33 @@ document.addEventListener('DOMContentLoaded', function() {
         });
     }
 
+    async function fetchSchedulePage(formData, cursor) {
+        const pageData = new FormData();
+        for (const [key, value] of formData.entries()) {
+            pageData.append(key, value);
+        }
+        pageData.set('limit', SCHEDULE_PAGE_SIZE);
+        pageData.set('cursor', cursor);
+        const response = await fetch('/schedule', {
+            method: 'POST',
+            body: pageData
+        });
+        return response.json();
+    }
+
     function updateScheduleDisplay() {
-        document.getElementById('scheduleIndex').textContent = `${window.currentScheduleIndex + 1}/${window.schedules.length}`;
+        const more = window.nextCursor != null ? '+' : '';
+        document.getElementById('scheduleIndex').textContent = `${window.currentScheduleIndex + 1}/${window.schedules.length}${more}`;
     }
     async function fetchAndDisplaySchedule(index) {
         const schedule = window.schedules[index];
         try {
-            const classDetailsArray = await Promise.all(schedule.map(async className => {
-                const res = await fetch(`/class_details?class_name=${className}`);
-                const data = await res.json();
-                return data.class_details;
-            }));
-            displaySchedule(classDetailsArray.flat());
+            // One request for every section of the schedule
+            const params = new URLSearchParams();
+            schedule.forEach(className => params.append('class_name', className));
+            const res = await fetch(`/class_details?${params}`);
+            const data = await res.json();
+            displaySchedule(data.class_details);
         } catch (error) {
             alert("Aucun horaire n'a été trouvé!")
             clearCalendar();
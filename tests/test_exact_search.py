@@ -0,0 +1,67 @@
+"""Exact search must return what itertools.product keeps, in a reproducible order."""
+import itertools
+import random
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from app import DAYS, Task, build_conflict_graph, find_possible_schedules, iter_schedules  # noqa: E402
+
+
+def random_request(rng, n_sigles):
+    # Half-hour grid: many meetings touch end to start, which is not a conflict
+    tasks = []
+    for s in range(n_sigles):
+        for g in range(rng.randint(1, 5)):
+            meetings = []
+            for _ in range(rng.randint(1, 3)):
+                start = rng.randrange(16, 40) * 30
+                meetings.append((rng.choice(DAYS[:6]), start, start + rng.choice([60, 90, 180])))
+            tasks.append(Task(f'S{s}AA100-x-{g}', meetings))
+    return tasks
+
+
+def overlap(a, b):
+    return any(day == other_day and start < other_end and other_start < end
+               for day, start, end in a.day_times for other_day, other_start, other_end in b.day_times)
+
+
+def brute_force(tasks):
+    by_sigle = {}
+    for task in tasks:
+        by_sigle.setdefault(task.sigle, []).append(task)
+    return sorted(sorted(task.name for task in combo)
+                  for combo in itertools.product(*by_sigle.values())
+                  if not any(overlap(a, b) for a, b in itertools.combinations(combo, 2)))
+
+
+def test_exact_matches_product():
+    rng = random.Random(3)
+    for _ in range(300):
+        tasks = random_request(rng, rng.randint(1, 5))
+        assert sorted(find_possible_schedules(tasks, exact=True)) == brute_force(tasks)
+
+
+def test_exact_on_a_season_graph_matches_product():
+    # The catalog gives tasks a season-wide conflict graph: requests slice it
+    rng = random.Random(4)
+    for _ in range(50):
+        season = random_request(rng, 12)
+        build_conflict_graph(season)
+        requested = set(rng.sample(sorted({task.sigle for task in season}), rng.randint(1, 5)))
+        tasks = [task for task in season if task.sigle in requested]
+        assert sorted(find_possible_schedules(tasks, exact=True)) == brute_force(tasks)
+
+
+def test_iter_schedules_order_is_stable():
+    rng = random.Random(5)
+    for _ in range(100):
+        tasks = random_request(rng, rng.randint(2, 5))
+        schedules = list(iter_schedules(tasks))
+        assert schedules == find_possible_schedules(tasks, exact=True)
+        # Paging skips the schedules already sent: every run, whatever the input order, must agree
+        shuffled = rng.sample(tasks, len(tasks))
+        assert list(iter_schedules(shuffled)) == schedules
+        cut = rng.randint(0, len(schedules))
+        assert list(itertools.islice(iter_schedules(tasks), cut)) == schedules[:cut]
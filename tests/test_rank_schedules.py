@@ -0,0 +1,60 @@
+"""Ranked searches must return the top-K scores of a brute-force enumeration."""
+import itertools
+import random
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from app import DAYS, OBJECTIVES, Task, find_possible_schedules, rank_schedules  # noqa: E402
+
+# Every ordered choice of objectives: pruning differs with which ones lead
+RANKINGS = [list(names) for size in range(1, len(OBJECTIVES) + 1)
+            for names in itertools.permutations(OBJECTIVES, size)]
+
+
+def random_request(rng):
+    tasks = []
+    for s in range(rng.randint(2, 4)):
+        for g in range(rng.randint(1, 5)):
+            meetings = []
+            for _ in range(rng.randint(1, 2)):
+                start = rng.randrange(16, 40) * 30
+                meetings.append((rng.choice(DAYS[:5]), start, start + rng.choice([90, 180])))
+            tasks.append(Task(f'S{s}AA100-x-{g}', meetings))
+    return tasks
+
+
+def score(tasks, names, rank_by):
+    by_name = {task.name: task for task in tasks}
+    day_times = [day_time for name in names for day_time in by_name[name].day_times]
+    return tuple(OBJECTIVES[objective](day_times) for objective in rank_by)
+
+
+def brute_force_scores(tasks, rank_by):
+    by_sigle = {}
+    for task in tasks:
+        by_sigle.setdefault(task.sigle, []).append(task)
+    return sorted(score(tasks, [task.name for task in combo], rank_by)
+                  for combo in itertools.product(*by_sigle.values())
+                  if not any(a.mask & b.mask for a, b in itertools.combinations(combo, 2)))
+
+
+def test_top_k_matches_brute_force():
+    rng = random.Random(6)
+    for rank_by in RANKINGS:
+        for _ in range(15):
+            tasks = random_request(rng)
+            top_k = rng.randint(1, 6)
+            ranked = rank_schedules(tasks, rank_by, top_k)
+            assert [score(tasks, names, rank_by) for names in ranked] == \
+                brute_force_scores(tasks, rank_by)[:top_k], rank_by
+
+
+def test_ranked_schedules_are_exact_schedules():
+    rng = random.Random(7)
+    for _ in range(50):
+        tasks = random_request(rng)
+        exact = find_possible_schedules(tasks, exact=True)
+        ranked = find_possible_schedules(tasks, rank_by=rng.choice(RANKINGS), top_k=len(exact) + 1)
+        assert sorted(ranked) == sorted(exact)
@@ -0,0 +1,93 @@
+"""Constrained searches must return exactly what a brute-force enumeration keeps."""
+import itertools
+import random
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import app  # noqa: E402
+from app import (DAYS, ScheduleConstraints, Task, campus_days, find_possible_schedules,  # noqa: E402
+                 idle_minutes, iter_schedules)
+
+SLOTS = [(480, 660), (540, 720), (780, 960), (840, 1020), (1080, 1260)]
+
+
+def random_request(rng):
+    tasks = []
+    for s in range(rng.randint(2, 5)):
+        for g in range(rng.randint(1, 5)):
+            meetings = [(rng.choice(DAYS[:5]), *rng.choice(SLOTS)) for _ in range(rng.randint(1, 3))]
+            tasks.append(Task(f'S{s}AA100-x-{g}', meetings))
+    return tasks
+
+
+def brute_force(tasks, constraints):
+    by_sigle = {}
+    for task in tasks:
+        by_sigle.setdefault(task.sigle, []).append(task)
+    schedules = []
+    for combo in itertools.product(*by_sigle.values()):
+        if any(a.mask & b.mask for a, b in itertools.combinations(combo, 2)):
+            continue
+        if any(task.mask & constraints.mask for task in combo):
+            continue
+        day_times = [day_time for task in combo for day_time in task.day_times]
+        if constraints.max_days is not None and campus_days(day_times) > constraints.max_days:
+            continue
+        schedules.append(sorted(task.name for task in combo))
+    return sorted(schedules)
+
+
+def score(tasks, names):
+    by_name = {task.name: task for task in tasks}
+    day_times = [day_time for name in names for day_time in by_name[name].day_times]
+    return campus_days(day_times), idle_minutes(day_times)
+
+
+def test_max_days_matches_brute_force():
+    rng = random.Random(0)
+    for _ in range(300):
+        tasks = random_request(rng)
+        constraints = ScheduleConstraints(max_days=rng.randint(1, 4))
+        expected = brute_force(tasks, constraints)
+
+        exact = find_possible_schedules(tasks, exact=True, constraints=constraints)
+        assert sorted(exact) == expected
+        assert list(iter_schedules(tasks, constraints=constraints)) == exact
+
+        ranked = find_possible_schedules(tasks, rank_by=['days', 'gaps'], top_k=3, constraints=constraints)
+        assert [score(tasks, names) for names in ranked] == \
+            sorted(score(tasks, names) for names in expected)[:3]
+
+
+def test_blocked_windows_and_forbidden_days_match_brute_force():
+    rng = random.Random(2)
+    for _ in range(100):
+        tasks = random_request(rng)
+        constraints = ScheduleConstraints(blocked=[(None, 0, 540), ('Mardi', 780, 1020)][:rng.randint(0, 2)],
+                                          forbidden_days=rng.sample(DAYS[:5], rng.randint(0, 2)),
+                                          max_days=rng.choice([None, 2, 3]))
+        assert sorted(find_possible_schedules(tasks, exact=True, constraints=constraints)) == \
+            brute_force(tasks, constraints)
+
+
+def test_max_days_parallel_matches_sequential():
+    rng = random.Random(1)
+    for _ in range(20):
+        tasks = random_request(rng)
+        constraints = ScheduleConstraints(max_days=rng.randint(1, 3))
+        allowed = constraints.restrict(tasks)
+        if allowed is None:
+            continue
+        sequential = find_possible_schedules(tasks, exact=True, constraints=constraints)
+        assert app._parallel_exact_schedules(allowed, 2, max_days=constraints.max_days) == sequential
+
+
+def test_invalid_constraints_are_rejected():
+    client = app.app.test_client()
+    for extra in ({'blocked': 'Lundi 10h00-8h00'}, {'blocked': 'Lundi 8h'}, {'forbidden_days': 'Fri'},
+                  {'max_days': 'abc'}, {'max_days': '0'}):
+        # Checked before the catalog: unknown sigles do not hide a bad request
+        response = client.post('/schedule', data={'sigles': 'NOPE1234', 'season': 'automne2025', **extra})
+        assert response.status_code == 400, extra
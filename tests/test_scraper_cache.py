@@ -0,0 +1,112 @@
+"""A second scrape of unchanged pages must parse nothing and write the same CSV."""
+import asyncio
+import hashlib
+import http.server
+import sys
+import threading
+from email.utils import formatdate
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / 'scrapers'))
+
+import scrape_cours_uqam  # noqa: E402
+
+SIGLES = ['INF1120', 'INF2120', 'MAT1600', 'ECO1300', 'FIN5570']
+
+
+def page(sigle):
+    """A course page in UQAM's layout; FIN5570 is not offered this year."""
+    parts = ['<html><body>']
+    for div_id, _ in scrape_cours_uqam.SEMESTERS:
+        parts.append(f"<div id='{div_id}'>")
+        if sigle == 'FIN5570':
+            parts.append("<p>Ce cours n'est pas offert</p>")
+        for group in range(sum(map(ord, sigle + div_id)) % 3 + 1):
+            parts.append(f"<div class='groupe'><h3 class='no_groupe'>Groupe 0{group + 10}</h3>"
+                         f"<h3>Enseignant</h3><ul><li> Prof {sigle[-1]}{group} </li></ul>"
+                         "<h3>Horaire et lieu</h3><table><tr><th>Jour</th></tr>"
+                         f"<tr><td>Lundi</td><td>Du 2 septembre 2025au 15 décembre 2025</td>"
+                         f"<td>De {9 + 3 * group:02d}h00 à {12 + 3 * group:02d}h00</td>"
+                         "<td>Campus&nbsp;de Montréal</td><td>Cours magistral</td></tr></table></div>")
+        parts.append('</div>')
+    parts.append('</body></html>')
+    return ''.join(parts).encode('utf-8')
+
+
+class StandIn(http.server.BaseHTTPRequestHandler):
+    """Answers like etudier.uqam.ca: ETag + Last-Modified, and 304 to matching validators."""
+    protocol_version = 'HTTP/1.1'
+    last_modified = formatdate(0, usegmt=True)
+    hits = {200: 0, 304: 0}
+
+    def log_message(self, *args):
+        pass
+
+    def do_GET(self):
+        body = page(self.path.rsplit('sigle=', 1)[1])
+        etag = '"' + hashlib.sha1(body).hexdigest() + '"'
+        if (self.headers.get('If-None-Match') == etag
+                or self.headers.get('If-Modified-Since') == self.last_modified):
+            self.hits[304] += 1
+            self.send_response(304)
+            self.send_header('ETag', etag)
+            self.send_header('Content-Length', '0')
+            self.end_headers()
+            return
+        self.hits[200] += 1
+        self.send_response(200)
+        self.send_header('ETag', etag)
+        self.send_header('Last-Modified', self.last_modified)
+        self.send_header('Content-Type', 'text/html; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+@pytest.fixture
+def scraper(tmp_path, monkeypatch):
+    server = http.server.ThreadingHTTPServer(('127.0.0.1', 0), StandIn)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    StandIn.hits.update({200: 0, 304: 0})
+    monkeypatch.setattr(scrape_cours_uqam, 'BASE_URL', f'http://127.0.0.1:{server.server_port}')
+    monkeypatch.setattr(scrape_cours_uqam, 'PAGE_CACHE_DB', tmp_path / 'page_cache.db')
+    monkeypatch.setattr(scrape_cours_uqam, 'OUTPUT_CSV', tmp_path / 'raw_data_uqam.csv')
+    monkeypatch.setattr(scrape_cours_uqam, 'JOURNAL_FILE', tmp_path / 'raw_data_uqam.journal')
+    monkeypatch.setattr(scrape_cours_uqam, 'PARSE_WORKERS', 2)
+    yield scrape_cours_uqam
+    server.shutdown()
+    server.server_close()
+
+
+def scrape(module):
+    stats = asyncio.run(module.main(sigles=SIGLES))
+    lines = module.OUTPUT_CSV.read_text(encoding='utf-8').splitlines()
+    # Rows are written in completion order; the Makefile sorts them anyway
+    return stats, lines[0], sorted(lines[1:])
+
+
+def test_unchanged_pages_are_not_parsed_again(scraper):
+    first = scrape(scraper)
+    assert first[0]['parsed'] == len(SIGLES) and first[0]['failed'] == 0
+    assert len(first[2]) > 0
+
+    second = scrape(scraper)
+    assert second[0]['parsed'] == 0
+    assert second[0]['not modified'] == len(SIGLES)
+    assert StandIn.hits[304] == len(SIGLES)
+    assert second[1:] == first[1:]
+
+
+def test_new_parser_signature_forces_a_reparse(scraper, monkeypatch):
+    first = scrape(scraper)
+    monkeypatch.setattr(scraper, 'PARSER_SIGNATURE', 'another parser')
+
+    second = scrape(scraper)
+    assert second[0]['parsed'] == len(SIGLES)
+    assert StandIn.hits[304] == 0
+    assert second[1:] == first[1:]
+
+    # The reparsed rows are cached under the new signature
+    assert scrape(scraper)[0]['parsed'] == 0
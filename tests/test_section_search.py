@@ -0,0 +1,86 @@
+"""The section search index must agree with a linear scan of the season's meetings."""
+import itertools
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import app  # noqa: E402
+from app import DAY_INDEX, MAX_SEARCH_RESULTS, MeetingIndex, _read_meetings_from_db  # noqa: E402
+
+SEASON = 'automne2025'
+DAYS = [[], ['Mardi'], ['Lundi', 'Mercredi', 'Samedi']]
+AFTER = [None, '8h00', '13h30', '18h']
+BEFORE = [None, '12h00', '17h', '22h30']
+# Values are typed with other case and spacing than the database's
+FILTERS = [{}, {'sigle': ['inf1120', 'INF2120', 'MAT1600']}, {'type': ['cours  MAGISTRAL']},
+           {'type': ['Atelier', 'laboratoire']}, {'location': [' campus de montréal ']},
+           {'teacher': ['non disponible']}, {'type': ['Cours magistral'], 'location': ['Campus de Montréal']}]
+
+
+def normalize(value):
+    return ' '.join(value.split()).casefold() if value else None
+
+
+def linear_scan(meetings, days, after, before, filters, whole_sections):
+    sizes = {}
+    for meeting in meetings:
+        sizes[meeting.name] = sizes.get(meeting.name, 0) + 1
+    sections = {}
+    for meeting in meetings:
+        if days or after is not None or before is not None:
+            if meeting.day_index is None or meeting.start is None or meeting.end is None:
+                continue
+            if days and meeting.day_index not in days:
+                continue
+            if after is not None and meeting.start < after:
+                continue
+            if before is not None and meeting.end > before:
+                continue
+        if any(normalize(getattr(meeting, field)) not in {normalize(value) for value in values}
+               for field, values in filters.items()):
+            continue
+        sections.setdefault(meeting.name, []).append(meeting)
+    if whole_sections:
+        sections = {name: found for name, found in sections.items() if len(found) == sizes[name]}
+    return sections
+
+
+def minutes(value):
+    return app._parse_minutes(value) if value else None
+
+
+def queries():
+    return itertools.product(DAYS, AFTER, BEFORE, FILTERS, (False, True))
+
+
+def test_index_matches_linear_scan():
+    meetings = _read_meetings_from_db(SEASON)
+    index = MeetingIndex(meetings)
+    for day_names, after, before, filters, whole_sections in queries():
+        days = [DAY_INDEX[day] for day in day_names]
+        expected = linear_scan(meetings, days, minutes(after), minutes(before), filters, whole_sections)
+        found = index.search(days, minutes(after), minutes(before), filters, whole_sections)
+        assert found == expected, (day_names, after, before, filters, whole_sections)
+
+
+def test_endpoint_matches_linear_scan():
+    meetings = _read_meetings_from_db(SEASON)
+    client = app.app.test_client()
+    for day_names, after, before, filters, whole_sections in queries():
+        query = {'season': SEASON, 'day': day_names, 'mode': 'all' if whole_sections else 'any',
+                 'limit': MAX_SEARCH_RESULTS, 'after': after or '', 'before': before or ''}
+        for field, values in filters.items():
+            query['sigles' if field == 'sigle' else field] = values
+        response = client.get('/search_sections', query_string=query)
+        assert response.status_code == 200
+
+        days = [DAY_INDEX[day] for day in day_names]
+        expected = linear_scan(meetings, days, minutes(after), minutes(before), filters, whole_sections)
+        body = response.get_json()
+        assert body['total'] == len(expected)
+        assert body['truncated'] == (len(expected) > MAX_SEARCH_RESULTS)
+        assert [section['name'] for section in body['sections']] == list(expected)[:MAX_SEARCH_RESULTS]
+        for section in body['sections']:
+            assert [(m['day'], m['start_time'], m['end_time']) for m in section['meetings']] == \
+                [(m.day, m.start_time, m.end_time) for m in expected[section['name']]]